@@ -0,0 +1,61 @@
+"""
+Memory per world and attribute access cost of the game objects.
+
+Run with ``python -m benchmarks.game_objects``.
+"""
+from types import SimpleNamespace
+
+from benchmarks.harness import (format_bytes, format_time, report,
+                                retained_memory, time_per_call)
+
+from sb.robot import SimRobot
+from sb.robot.arenas import TCRArena
+from sb.robot.arenas.tin_can_rally import Token, TCRWall
+
+WORLDS = 10
+EXTRA_TOKENS = 200
+ROBOTS = 2
+
+
+def make_world():
+    arena = TCRArena()
+    for i in range(EXTRA_TOKENS):
+        token = Token(arena, i, damping=5)
+        token.location = (i % 20 * 0.3 - 3, i // 20 * 0.3 - 3)
+        arena.objects.append(token)
+    for zone in range(ROBOTS):
+        robot = SimRobot(SimpleNamespace(arena=arena))
+        robot.location = arena.start_locations[zone]
+    return arena
+
+
+def first_of_type(arena, cls):
+    return next(o for o in arena.objects if isinstance(o, cls))
+
+
+def main():
+    memory, worlds = retained_memory(
+        lambda: [make_world() for _ in range(WORLDS)])
+    n_objects = len(worlds[0].objects)
+
+    report('Memory ({0} objects per world)'.format(n_objects), [
+        ('per world', format_bytes(memory / WORLDS)),
+        ('per object', '{0:.0f} B'.format(memory / WORLDS / n_objects)),
+    ])
+
+    arena = worlds[0]
+    token = first_of_type(arena, Token)
+    wall = first_of_type(arena, TCRWall)
+    robot = first_of_type(arena, SimRobot)
+
+    report('Attribute access', [
+        ('Token.location', format_time(time_per_call(lambda: token.location))),
+        ('TCRWall.location', format_time(time_per_call(lambda: wall.location))),
+        ('SimRobot.location', format_time(time_per_call(lambda: robot.location))),
+        ('SimRobot.heading', format_time(time_per_call(lambda: robot.heading))),
+        ('Token.lock', format_time(time_per_call(lambda: token.lock))),
+    ])
+
+
+if __name__ == '__main__':
+    main()
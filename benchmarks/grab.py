@@ -0,0 +1,66 @@
+"""
+Cost of stepping a world full of robots which are all holding tokens, for
+each way of attaching grabbed tokens on each available physics backend.
+
+Run with ``python -m benchmarks.grab``.
+"""
+from benchmarks.harness import format_time, report, time_per_call
+
+from sb.robot import WorldBatch
+from sb.robot.physics import BACKENDS, get_backend
+from sb.robot.sim_robot import GRAB_ATTACHMENTS
+
+# Where to put the robots, clear of each other and the central wall
+ROBOT_LOCATIONS = [(-3, -2), (-1.5, -2.5), (1.5, -2.5),
+                   (-1.5, 2.5), (1.5, 2.5), (3, 2)]
+# How far in front of a robot to put its token, so that it can be grabbed
+TOKEN_DISTANCE = 0.32
+TIME_STEP = 1 / 30
+
+
+def spin(robot, world):
+    # Spinning on the spot keeps the robots from wandering into each other
+    robot.motors[0].m0.power = 50
+    robot.motors[0].m1.power = -50
+
+
+def make_batch(backend, attachment, holding=True):
+    batch = WorldBatch({'physics': backend, 'grab_attachment': attachment})
+    world = batch[0]
+    tokens = [obj for obj in world.arena.objects if obj.grabbable]
+    zones = len(world.arena.start_locations)
+    for i, ((x, y), token) in enumerate(zip(ROBOT_LOCATIONS, tokens)):
+        robot = world.add_robot(spin, zone=i % zones)
+        robot.location = (x, y)
+        robot.heading = 0
+        if holding:
+            token.location = (x + TOKEN_DISTANCE, y)
+            token.heading = 0
+            assert robot.grab()
+    return batch
+
+
+def main():
+    rows = []
+    for name, _ in BACKENDS:
+        try:
+            get_backend(name)
+        except ImportError:
+            rows.append((name, 'not installed'))
+            continue
+        batch = make_batch(name, GRAB_ATTACHMENTS[0], holding=False)
+        rows.append(('{0}, holding nothing'.format(name),
+                     format_time(time_per_call(
+                         lambda: batch.step(TIME_STEP), number=100))))
+        for attachment in GRAB_ATTACHMENTS:
+            batch = make_batch(name, attachment)
+            rows.append(('{0}, {1}'.format(name, attachment),
+                         format_time(time_per_call(
+                             lambda: batch.step(TIME_STEP), number=100))))
+
+    report('Time per step ({0} robots holding tokens)'.format(
+        len(ROBOT_LOCATIONS)), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Each benchmark is a module in this directory, run from the root of the
+repository with ``python -m benchmarks.<name>``.
+"""
+import gc
+import timeit
+import tracemalloc
+
+
+def time_per_call(fn, number=10000, repeat=5):
+    """Return the best observed time, in seconds, of a single call to `fn`."""
+    timer = timeit.Timer(fn)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def retained_memory(factory):
+    """
+    Return the number of bytes still allocated once `factory()` has returned,
+    along with the object it returned (which keeps the memory alive).
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = factory()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return after - before, result
+
+
+def report(title, rows):
+    """Print a two column table of (label, value) rows under a title."""
+    print(title)
+    print('-' * len(title))
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print('  {0:<{1}}  {2}'.format(label, width, value))
+    print()
+
+
+def format_time(seconds):
+    for unit, scale in (('ns', 1e9), ('us', 1e6)):
+        if seconds * scale < 1000:
+            return '{0:.1f} {1}'.format(seconds * scale, unit)
+    return '{0:.2f} ms'.format(seconds * 1e3)
+
+
+def format_bytes(n_bytes):
+    return '{0:.1f} KiB'.format(n_bytes / 1024)
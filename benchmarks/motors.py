@@ -0,0 +1,67 @@
+"""
+Cost of setting motor powers, and of stepping a world while a controller
+thread sets them as fast as it can.
+
+Powers are set without a CPU account, with the one `run_match` gives every
+robot, and with one holding the robot to a budget.
+
+Run with ``python -m benchmarks.motors``.
+"""
+import threading
+
+from benchmarks.harness import format_time, report, time_per_call
+
+from sb.robot import WorldBatch, make_cpu_account
+
+TIME_STEP = 1 / 30
+
+
+def idle(robot, world):
+    pass
+
+
+def main():
+    world = WorldBatch()[0]
+    robot = world.add_robot(idle)
+    channel = robot.motors[0].m0
+
+    def set_power():
+        channel.power = 50
+
+    rows = [('set power', format_time(time_per_call(set_power)))]
+    for label, cpu_budget in (('run_match account', None),
+                              ('budgeted account', 100)):
+        robot.cpu_account = make_cpu_account(world.arena, cpu_budget)
+        robot.cpu_account.start()
+        rows.append(('set power, ' + label,
+                     format_time(time_per_call(set_power))))
+    # As run_match sets it up
+    robot.cpu_account = make_cpu_account(world.arena)
+    robot.cpu_account.start()
+
+    rows.append(('step, quiet controller', format_time(time_per_call(
+        lambda: world.step(TIME_STEP), number=100))))
+
+    stop = threading.Event()
+
+    def spam():
+        while not stop.is_set():
+            channel.power = 50
+            channel.power = -50
+
+    thread = threading.Thread(target=spam)
+    thread.start()
+    try:
+        rows.append(('step, spamming controller', format_time(time_per_call(
+            lambda: world.step(TIME_STEP), number=100))))
+    finally:
+        stop.set()
+        thread.join()
+
+    rows.append(('commands superseded', '{0:.1%}'.format(
+        channel.superseded / channel.commands)))
+    report('Motor commands', rows)
+
+
+if __name__ == '__main__':
+    main()
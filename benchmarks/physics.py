@@ -0,0 +1,43 @@
+"""
+Cost of stepping a world on each available physics backend.
+
+Run with ``python -m benchmarks.physics``.
+"""
+from benchmarks.harness import format_time, report, time_per_call
+
+from sb.robot import WorldBatch
+from sb.robot.physics import BACKENDS, get_backend
+
+ROBOTS = 2
+TIME_STEP = 1 / 30
+
+
+def drive(robot, world):
+    robot.motors[0].m0.power = 60
+    robot.motors[0].m1.power = 40
+
+
+def make_batch(backend):
+    batch = WorldBatch({'physics': backend})
+    for _ in range(ROBOTS):
+        batch[0].add_robot(drive)
+    return batch
+
+
+def main():
+    rows = []
+    for name, _ in BACKENDS:
+        try:
+            get_backend(name)
+        except ImportError:
+            rows.append((name, 'not installed'))
+            continue
+        batch = make_batch(name)
+        rows.append((name, format_time(time_per_call(
+            lambda: batch.step(TIME_STEP), number=100))))
+
+    report('Time per step ({0} robots)'.format(ROBOTS), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Cost of keeping a rewind history: the time added to each arena tick, and
+the memory it takes.
+
+Run with ``python -m benchmarks.rewind``.
+"""
+from benchmarks.harness import format_bytes, format_time, report, time_per_call
+
+from sb.robot import WorldBatch
+
+ROBOTS = 2
+TIME_STEP = 1 / 30
+
+
+def drive(robot, world):
+    robot.motors[0].m0.power = 60
+    robot.motors[0].m1.power = 40
+
+
+def make_world(rewind):
+    world = WorldBatch()[0]
+    # Headless worlds keep no history unless asked, as a Simulator does
+    world.arena.keep_history(rewind)
+    for _ in range(ROBOTS):
+        world.add_robot(drive)
+    return world
+
+
+def main():
+    rows = []
+    for label, rewind in (('off', 0), ('default', None)):
+        world = make_world(rewind)
+        rows.append(('tick, rewind ' + label, format_time(time_per_call(
+            lambda: world.arena.tick(TIME_STEP), number=300))))
+
+    arena = world.arena
+    history = arena.history
+    rows.append(('record alone ({0} objects)'.format(len(history.tracked)),
+                 format_time(time_per_call(
+                     lambda: history.record(arena.time, arena.objects)))))
+    rows.append(('memory ({0} steps of {1} objects)'.format(
+        history.steps, history.max_objects), format_bytes(history.memory)))
+
+    report('Rewind history', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+How long it takes to get as far as having an arena and a compiled robot
+script: starting a fresh interpreter, as run.py does, compared with forking
+a worker from a process which has already loaded everything, as serve.py
+does.
+
+Run with ``python -m benchmarks.startup``.
+"""
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import format_time, report, time_per_call
+
+from sb.robot.match import compile_script
+from sb.robot.simulator import make_arena
+
+CONFIG = {'game': 'tin-can-rally'}
+SCRIPT = 'test.py'
+
+COLD_START = '''
+import yaml
+from sb.robot.match import compile_script
+from sb.robot.simulator import make_arena
+with open('games/tcr.yaml') as f:
+    make_arena(yaml.safe_load(f))
+compile_script({0!r})
+'''.format(SCRIPT)
+
+
+def cold():
+    subprocess.check_call([sys.executable, '-c', COLD_START],
+                          stdout=subprocess.DEVNULL,
+                          stderr=subprocess.DEVNULL)
+
+
+def forked():
+    pid = os.fork()
+    if pid == 0:
+        make_arena(CONFIG)
+        compile_script(SCRIPT)
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+
+def main():
+    compile_script(SCRIPT)
+    report('Time to start a match', [
+        ('fresh interpreter', format_time(time_per_call(cold, number=5,
+                                                        repeat=3))),
+        ('forked from a warm server', format_time(time_per_call(forked,
+                                                                number=20))),
+        ('compiling ' + SCRIPT, format_time(time_per_call(
+            lambda: compile(open(SCRIPT).read(), SCRIPT, 'exec'),
+            number=100))),
+        ('cached ' + SCRIPT, format_time(time_per_call(
+            lambda: compile_script(SCRIPT), number=100))),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Cost of an ultrasound ping in each of the sensor modes.
+
+Run with ``python -m benchmarks.ultrasound``.
+"""
+from statistics import mean, pstdev
+
+from benchmarks.harness import format_time, report, time_per_call
+
+from sb.robot import WorldBatch
+from sb.robot.ultrasound import ULTRASOUND_MODES
+
+READINGS = 200
+
+
+def make_robot(mode):
+    world = WorldBatch({'ultrasound': mode})[0]
+    robot = world.add_robot(lambda robot, world: None)
+    # Facing the centre wall, with the robot's centre 1.5m from it
+    robot.location = (-3.5, 0)
+    robot.heading = 0
+    return robot
+
+
+def main():
+    cost = []
+    readings = []
+    for mode in sorted(ULTRASOUND_MODES):
+        robot = make_robot(mode)
+        ping = lambda: robot.send_ultrasound_ping(0)
+        cost.append((mode, format_time(time_per_call(ping, number=200))))
+
+        distances = [ping() for _ in range(READINGS)]
+        distances = [d for d in distances if d is not None]
+        readings.append((mode, '{0:.3f} m +/- {1:.3f} m ({2} detections)'.format(
+            mean(distances), pstdev(distances), len(distances))))
+
+    report('Time per ping', cost)
+    report('Reading of a wall 1.5 m away', readings)
+
+
+if __name__ == '__main__':
+    main()
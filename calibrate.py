@@ -0,0 +1,75 @@
+import argparse
+
+import yaml
+
+from sb.robot.calibration import load_trials, profile_grid, sweep
+from sb.robot.drive import DEFAULT_DRIVE_PROFILE, DriveProfile
+
+
+def value_range(spec):
+    """Parse `start:stop:count` into `count` evenly spaced values."""
+    try:
+        start, stop, count = spec.split(':')
+        start, stop, count = float(start), float(stop), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "expected start:stop:count, got {0!r}".format(spec))
+    if count < 2:
+        return [start]
+    return [start + (stop - start) * i / (count - 1) for i in range(count)]
+
+
+parser = argparse.ArgumentParser(
+    description="Find the drive profile which best reproduces recorded "
+                "robot paths.")
+parser.add_argument('-c', '--config',
+                    type=argparse.FileType('r'),
+                    default='games/tcr.yaml')
+parser.add_argument('-j', '--workers',
+                    type=int,
+                    default=None,
+                    help="number of processes to use (default: one per CPU)")
+parser.add_argument('--top',
+                    type=int,
+                    default=5,
+                    help="number of profiles to list")
+for field in DriveProfile._fields:
+    default = getattr(DEFAULT_DRIVE_PROFILE, field)
+    parser.add_argument('--' + field.replace('_', '-'),
+                        type=value_range,
+                        default=value_range('{0}:{1}:5'.format(default * 0.8,
+                                                               default * 1.2)),
+                        metavar='START:STOP:COUNT',
+                        help="values to try (default: within 20%% of "
+                             "{0})".format(default))
+parser.add_argument('trials',
+                    type=argparse.FileType('r'))
+
+
+def main():
+    args = parser.parse_args()
+
+    with args.config as f:
+        config = yaml.safe_load(f)
+
+    with args.trials as f:
+        trials = load_trials(f)
+
+    profiles = profile_grid(**{field: getattr(args, field)
+                               for field in DriveProfile._fields})
+    print("Trying {0} profiles against {1} trials...".format(len(profiles),
+                                                            len(trials)))
+    scores = sweep(profiles, trials, config, workers=args.workers)
+
+    for error, profile in scores[:args.top]:
+        print("  {0:.4f} m  {1}".format(error, profile))
+
+    _, best = scores[0]
+    print("Best fit, for the game's configuration file:")
+    print(yaml.safe_dump({'drive': dict(best._asdict())},
+                         default_flow_style=False))
+
+
+if __name__ == '__main__':
+    # Worker processes import this module, so only sweep when run directly
+    main()
@@ -1,2 +1,5 @@
 from .simulator import Simulator
 from .sim_robot import SimRobot, AlreadyHoldingSomethingException
+from .batch import World, WorldBatch
+from .cpu import CPUAccount, make_cpu_account
+from .vision import MARKER_ARENA, MARKER_TOKEN
@@ -1,12 +1,17 @@
-from math import pi
+from math import pi, cos, floor, sin
 
 import pygame
 
-from ..display import get_surface
-
 import threading
 
-import pypybox2d
+from ..game_object import StaticObject
+from ..physics import (STATIC, CATEGORY_WALL, ALL_CATEGORIES,
+                       get_backend)
+from ..drive import make_drive_profile
+from ..rewind import make_pose_history
+from ..sim_robot import ATTACH_FIXTURE, GRAB_ATTACHMENTS
+from ..ultrasound import make_ultrasound
+from ..vision import MARKER_ARENA, Vision, create_marker_info_by_type
 
 MARKERS_PER_WALL = 7
 
@@ -82,6 +87,22 @@ def draw_triangular_corner_zones(arena, display, surface):
         starting_zone(pos)
 
 
+class WallMarker(StaticObject):
+    __slots__ = ('marker_info',)
+
+    surface_name = 'sb/wall_marker.png'
+
+    def __init__(self, arena, offset, location, heading):
+        super(WallMarker, self).__init__(arena, location, heading)
+        self.marker_info = create_marker_info_by_type(MARKER_ARENA, offset)
+
+    def faces(self, x, y):
+        # Markers face into the arena, along their heading
+        marker_x, marker_y = self.location
+        return ((x - marker_x) * cos(self.heading) +
+                (y - marker_y) * sin(self.heading)) > 0
+
+
 class Arena(object):
     size = (8, 8)
     start_locations = [(0, 0)]
@@ -89,6 +110,10 @@ class Arena(object):
 
     motif_name = 'sb/logo.png'
 
+    # Pairs of collision categories whose contacts are passed to
+    # `handle_contacts`
+    watched_contacts = ()
+
     @property
     def left(self):
         return -self.size[0] / 2
@@ -112,16 +137,18 @@ class Arena(object):
         yield (self.right, self.bottom)
         yield (self.left, self.bottom)
 
-    def _init_physics(self):
-        self._physics_world = pypybox2d.world.World(gravity=(0, 0))
+    def _init_physics(self, physics):
+        self._physics_world = get_backend(physics)()
         # Global lock for simulation
         self.physics_lock = threading.RLock()
         # Create the arena wall
         WALL_WIDTH = 2
-        WALL_SETTINGS = {'restitution': 0.2, 'friction': 0.3}
+        WALL_SETTINGS = {'restitution': 0.2, 'friction': 0.3,
+                         'category_bits': CATEGORY_WALL,
+                         'mask_bits': ALL_CATEGORIES & ~CATEGORY_WALL}
 
         wall_right = self._physics_world.create_body(position=(self.right, 0),
-                                                     type=pypybox2d.body.Body.STATIC)
+                                                     type=STATIC)
         wall_right.create_polygon_fixture([(WALL_WIDTH, self.top - WALL_WIDTH),
                                            (WALL_WIDTH, self.bottom + WALL_WIDTH),
                                            (0, self.bottom + WALL_WIDTH),
@@ -129,7 +156,7 @@ class Arena(object):
                                           **WALL_SETTINGS)
 
         wall_left = self._physics_world.create_body(position=(self.left, 0),
-                                                    type=pypybox2d.body.Body.STATIC)
+                                                    type=STATIC)
         wall_left.create_polygon_fixture([(-WALL_WIDTH, self.top - WALL_WIDTH),
                                           (0, self.top - WALL_WIDTH),
                                           (0, self.bottom + WALL_WIDTH),
@@ -137,7 +164,7 @@ class Arena(object):
                                          **WALL_SETTINGS)
 
         wall_top = self._physics_world.create_body(position=(0, self.top),
-                                                   type=pypybox2d.body.Body.STATIC)
+                                                   type=STATIC)
         wall_top.create_polygon_fixture([(self.left, 0),
                                          (self.left, -WALL_WIDTH),
                                          (self.right, -WALL_WIDTH),
@@ -145,16 +172,50 @@ class Arena(object):
                                         **WALL_SETTINGS)
 
         wall_bottom = self._physics_world.create_body(position=(0, self.bottom),
-                                                      type=pypybox2d.body.Body.STATIC)
+                                                      type=STATIC)
         wall_bottom.create_polygon_fixture([(self.left, 0),
                                             (self.right, 0),
                                             (self.right, WALL_WIDTH),
                                             (self.left, WALL_WIDTH)],
                                            **WALL_SETTINGS)
 
-    def __init__(self, objects=None):
-        self._init_physics()
+        for wall in (wall_right, wall_left, wall_top, wall_bottom):
+            wall.user_data = self
+
+    def _init_wall_markers(self):
+        width, height = self.size
+        # Clockwise from the top left corner, facing into the arena
+        walls = [((self.left, self.top), (width, 0), pi / 2),
+                 ((self.right, self.top), (0, height), pi),
+                 ((self.right, self.bottom), (-width, 0), -pi / 2),
+                 ((self.left, self.bottom), (0, -height), 0)]
+        for i, ((start_x, start_y), (dx, dy), heading) in enumerate(walls):
+            for j in range(MARKERS_PER_WALL):
+                delta = (j + 1) / (MARKERS_PER_WALL + 1)
+                location = (start_x + dx * delta, start_y + dy * delta)
+                marker = WallMarker(self, i * MARKERS_PER_WALL + j,
+                                    location, heading)
+                self.objects.append(marker)
+
+    def __init__(self, objects=None, physics=None, ultrasound=None,
+                 grab_attachment=ATTACH_FIXTURE, drive=None):
+        if grab_attachment not in GRAB_ATTACHMENTS:
+            raise ValueError("Unknown grab attachment {0!r} (expected one of "
+                             "{1})".format(grab_attachment,
+                                           ', '.join(GRAB_ATTACHMENTS)))
+        self.grab_attachment = grab_attachment
+        self._init_physics(physics)
         self.objects = objects if objects is not None else []
+        self.time = 0
+        self._init_wall_markers()
+        self.vision = Vision(self)
+        self.ultrasound = make_ultrasound(ultrasound)
+        self.drive = make_drive_profile(drive)
+        # Recent poses of everything that moves, or None if not kept
+        self.history = None
+        self.contact_listeners = []
+        for category_a, category_b in self.watched_contacts:
+            self.watch_contacts(category_a, category_b)
 
     ## Public Methods ##
 
@@ -167,11 +228,49 @@ class Arena(object):
         else:
             return True, None, None
 
+    def keep_history(self, config=None):
+        """
+        Start keeping the recent poses of everything that moves, as described
+        by a game's `rewind` option, so that a display can scrub back through
+        them. Arenas without a display don't need to pay for this.
+        """
+        with self.physics_lock:
+            self.history = make_pose_history(
+                config, robot_slots=len(self.start_locations))
+
+    def watch_contacts(self, category_a, category_b):
+        """Start reporting contacts between the two collision categories."""
+        with self.physics_lock:
+            self._physics_world.watch_contacts(category_a, category_b)
+
+    def add_contact_listener(self, listener, category_a, category_b):
+        """
+        Call `listener` with each step's batch of contact events, and start
+        watching contacts between `category_a` and `category_b`. The batch
+        includes every watched pair, not just the listener's.
+        """
+        self.watch_contacts(category_a, category_b)
+        self.contact_listeners.append(listener)
+
+    def handle_contacts(self, contacts):
+        """
+        Called with the `ContactEvent`s of each step which had any, for
+        arenas' rules to act on.
+        """
+        pass
+
     def tick(self, time_passed):
         with self.physics_lock:
-            self._physics_world.step(time_passed,
-                                     vel_iters=8,
-                                     pos_iters=3)
+            contacts = self._physics_world.step(time_passed,
+                                                vel_iters=8,
+                                                pos_iters=3)
+            self.time += time_passed
+            if self.history is not None:
+                self.history.record(self.time, self.objects)
+        if contacts:
+            self.handle_contacts(contacts)
+            for listener in self.contact_listeners:
+                listener(contacts)
         for obj in self.objects:
             if hasattr(obj, "tick"):
                 obj.tick(time_passed)
@@ -180,7 +279,8 @@ class Arena(object):
         surface.fill(ARENA_FLOOR_COLOR)
 
         # Motif
-        motif = get_surface(self.motif_name)
+        motif = display.sprite(self.motif_name)
         x, y = display.to_pixel_coord((0, 0), self)
         w, h = motif.get_size()
-        surface.blit(motif, (x - w / 2, y - h / 2))
+        # Whole pixels, so the motif lines up across the display's tiles
+        surface.blit(motif, (int(floor(x - w / 2)), int(floor(y - h / 2))))
@@ -3,42 +3,26 @@
 from math import pi
 
 import pygame
-import pypybox2d
 
 from sb.robot.arenas import Arena
 from sb.robot.arenas.arena import ARENA_MARKINGS_COLOR, ARENA_MARKINGS_WIDTH
-from sb.robot.display import get_surface
-from ..game_object import GameObject
+from ..game_object import PhysicsObject, StaticObject
+from ..vision import MARKER_TOKEN, create_marker_info_by_type
+from ..physics import (STATIC, DYNAMIC, CATEGORY_WALL, CATEGORY_TOKEN,
+                       ALL_CATEGORIES)
 
 WALL_DIAMETER_METRES = 4
 
 
-class TCRWall(GameObject):
-    @property
-    def location(self):
-        return self._body.position
-
-    @location.setter
-    def location(self, new_pos):
-        if self._body is None:
-            return  # Slight hack: deal with the initial setting from the constructor
-        self._body.position = new_pos
+class TCRWall(StaticObject):
+    __slots__ = ('_body',)
 
-    @property
-    def heading(self):
-        return self._body.angle
-
-
-    @heading.setter
-    def heading(self, _new_heading):
-        if self._body is None:
-            return  # Slight hack: deal with the initial setting from the constructor
-        self._body.angle = _new_heading
+    opaque = True
 
-    def __init__(self, arena):
-        self._body = arena._physics_world.create_body(position=(0, 0),
-                                                      angle=0,
-                                                      type=pypybox2d.body.Body.STATIC)
+    def __init__(self, arena, location=(0, 0), heading=0):
+        self._body = arena._physics_world.create_body(position=location,
+                                                      angle=heading,
+                                                      type=STATIC)
 
         point_dist = WALL_DIAMETER_METRES / 2
         self._body.create_polygon_fixture([(-point_dist, -point_dist),
@@ -46,49 +30,87 @@ class TCRWall(GameObject):
                                            (point_dist, point_dist),
                                            (-point_dist, point_dist)],
                                           restitution=0.2,
-                                          friction=0.3)
-        super().__init__(arena)
+                                          friction=0.3,
+                                          category_bits=CATEGORY_WALL,
+                                          mask_bits=ALL_CATEGORIES & ~CATEGORY_WALL)
+        self._body.user_data = self
+        super().__init__(arena, location, heading)
+
+    @property
+    def bounds(self):
+        x, y = self.location
+        point_dist = WALL_DIAMETER_METRES / 2
+        return (x - point_dist, y - point_dist,
+                x + point_dist, y + point_dist)
+
+
+TOKEN_WIDTH = 0.08
 
 
-class Token(GameObject):
+class Token(PhysicsObject):
+    __slots__ = ('grabbed', 'marker_info', '_carrier', '_carried_at')
+
     grabbable = True
 
+    vertices = [(-TOKEN_WIDTH, -TOKEN_WIDTH),
+                (TOKEN_WIDTH, -TOKEN_WIDTH),
+                (TOKEN_WIDTH,  TOKEN_WIDTH),
+                (-TOKEN_WIDTH,  TOKEN_WIDTH)]
+    fixture_settings = {'density': 1,
+                        'restitution': 0.2,
+                        'friction': 0.3,
+                        'category_bits': CATEGORY_TOKEN}
+
     @property
     def location(self):
-        return self._body.position
+        if self._carrier is None:
+            return self._body.position
+        return self._carrier._body.get_world_point(self._carried_at[0])
 
     @location.setter
     def location(self, new_pos):
-        if self._body is None:
-            return  # Slight hack: deal with the initial setting from the constructor
-        self._body.position = new_pos
+        PhysicsObject.location.fset(self, new_pos)
 
     @property
     def heading(self):
-        return self._body.angle
+        if self._carrier is None:
+            return self._body.angle
+        return self._carrier.heading + self._carried_at[1]
 
     @heading.setter
-    def heading(self, _new_heading):
-        if self._body is None:
-            return  # Slight hack: deal with the initial setting from the constructor
-        self._body.angle = _new_heading
+    def heading(self, new_heading):
+        PhysicsObject.heading.fset(self, new_heading)
+
+    @property
+    def asleep(self):
+        # A carried token moves with its carrier, whatever its body does
+        return self._carrier is None and not self._body.awake
 
     def __init__(self, arena, number, damping):
-        self._body = arena._physics_world.create_body(position=(0, 0),
-                                                      angle=0,
-                                                      linear_damping=damping,
-                                                      angular_damping=damping*2,
-                                                      type=pypybox2d.body.Body.DYNAMIC)
-        super(Token, self).__init__(arena)
+        body = arena._physics_world.create_body(position=(0, 0),
+                                                angle=0,
+                                                linear_damping=damping,
+                                                angular_damping=damping*2,
+                                                type=DYNAMIC)
+        self._carrier = None
+        self._carried_at = None
+        super(Token, self).__init__(arena, body)
         self.grabbed = False
-        WIDTH = 0.08
-        self._body.create_polygon_fixture([(-WIDTH, -WIDTH),
-                                           (WIDTH, -WIDTH),
-                                           (WIDTH,  WIDTH),
-                                           (-WIDTH,  WIDTH)],
-                                          density=1,
-                                          restitution=0.2,
-                                          friction=0.3)
+        self.marker_info = create_marker_info_by_type(MARKER_TOKEN, number)
+        self._body.create_polygon_fixture(self.vertices,
+                                          **self.fixture_settings)
+
+    def carry(self, carrier, local_point, local_angle):
+        """
+        Follow `carrier` around, at the given point and angle relative to it,
+        while this token's own body is out of the world.
+        """
+        self._carrier = carrier
+        self._carried_at = (local_point, local_angle)
+
+    def drop(self):
+        self._carrier = None
+        self._carried_at = None
 
     def grab(self):
         self.grabbed = True
@@ -108,8 +130,8 @@ class TCRArena(Arena):
     start_headings = [pi / 2,
                       -pi / 2]
 
-    def __init__(self, objects=None):
-        super().__init__(objects)
+    def __init__(self, objects=None, **kwargs):
+        super().__init__(objects, **kwargs)
         self._init_walls()
         self._init_tokens()
 
@@ -132,10 +154,8 @@ class TCRArena(Arena):
 
     def _init_walls(self):
         wall_locations = [(0, 0)]
-        for x, y in wall_locations:
-            wall = TCRWall(self)
-            wall.location = (x, y)
-            self.objects.append(wall)
+        for location in wall_locations:
+            self.objects.append(TCRWall(self, location))
 
     def draw_background(self, surface, display):
         super().draw_background(surface, display)
@@ -0,0 +1,137 @@
+"""
+Run many independent arenas in a single process.
+
+This avoids paying interpreter start-up, imports and asset loading once per
+match when evaluating lots of small matches. Nothing here touches pygame's
+display, so batches run headless.
+"""
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from .sim_robot import SimRobot
+from .simulator import make_arena
+
+
+class World(object):
+    """
+    One arena hosted by a `WorldBatch`, with its own robots, controllers and
+    results.
+
+    A controller is a callable taking ``(robot, world)``, called once before
+    every physics step. Controllers (and scoring functions) may record
+    whatever they like in ``world.results``.
+    """
+
+    def __init__(self, index, arena):
+        self.index = index
+        self.arena = arena
+        self.time = 0
+        self.results = {}
+        self.error = None
+        self._controllers = []
+
+    def __repr__(self):
+        return "World({0})".format(self.index)
+
+    @property
+    def robots(self):
+        return [robot for robot, _ in self._controllers]
+
+    @property
+    def finished(self):
+        return self.error is not None
+
+    def add_robot(self, controller, zone=None):
+        """
+        Put a robot in the given starting zone (or the next free one), driven
+        by `controller`.
+        """
+        if zone is None:
+            zone = len(self._controllers)
+        with self.arena.physics_lock:
+            robot = SimRobot(self)
+            robot.zone = zone
+            robot.location = self.arena.start_locations[zone]
+            robot.heading = self.arena.start_headings[zone]
+        self._controllers.append((robot, controller))
+        return robot
+
+    def step(self, time_passed):
+        if self.finished:
+            return
+        try:
+            for robot, controller in self._controllers:
+                controller(robot, self)
+        except Exception as e:
+            # A broken controller only stops its own world
+            self.error = e
+            self.results['error'] = repr(e)
+            return
+        self.arena.tick(time_passed)
+        self.time += time_passed
+
+
+class WorldBatch(object):
+    """
+    A batch of `count` independent worlds, all playing the game described
+    by `config`.
+
+    Worlds are stepped round-robin. Passing `workers` steps them across a
+    thread pool instead, but only if the physics backend releases the GIL
+    while stepping; otherwise the threads would just take turns, so the
+    batch warns and carries on round-robin.
+    """
+
+    def __init__(self, config=None, count=1, workers=None):
+        self.worlds = [World(i, make_arena(config)) for i in range(count)]
+        self.workers = workers
+        if workers and not self.parallel:
+            warnings.warn("The physics backend doesn't release the GIL, so "
+                          "worlds will be stepped one at a time")
+
+    @property
+    def parallel(self):
+        """Whether the worlds can be stepped at once from separate threads."""
+        return all(type(world.arena._physics_world).releases_gil
+                   for world in self.worlds)
+
+    def __len__(self):
+        return len(self.worlds)
+
+    def __iter__(self):
+        return iter(self.worlds)
+
+    def __getitem__(self, index):
+        return self.worlds[index]
+
+    def step(self, time_passed, pool=None):
+        worlds = [world for world in self.worlds if not world.finished]
+        if pool is None:
+            for world in worlds:
+                world.step(time_passed)
+        else:
+            for future in [pool.submit(world.step, time_passed)
+                           for world in worlds]:
+                future.result()
+
+    def run(self, duration, time_passed=1 / 30, score=None):
+        """
+        Step every world for `duration` simulated seconds and return the
+        results of each world, in order.
+
+        If given, `score(world)` is called at the end of the run and should
+        return a dict, which is merged into that world's results.
+        """
+        steps = int(round(duration / time_passed))
+        if self.workers and self.parallel:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for _ in range(steps):
+                    self.step(time_passed, pool)
+        else:
+            for _ in range(steps):
+                self.step(time_passed)
+
+        if score is not None:
+            for world in self.worlds:
+                world.results.update(score(world))
+        return [world.results for world in self.worlds]
@@ -0,0 +1,139 @@
+"""
+Fitting the drive model to real robots.
+
+A trial is a scripted run of a real robot: the motor powers it was driven
+with, and the path it took, as loaded from a YAML file like this one:
+
+    - name: straight then turn
+      start: [-3, -3, 0]        # x, y, heading in the arena
+      motors:                   # seconds, m0 power, m1 power
+        - [2.0, 50, 50]
+        - [1.0, -40, 40]
+      path:                     # seconds, x, y, heading
+        - [0.5, -2.8, -3.0, 0.0]
+        - [1.0, -2.4, -3.0, 0.01]
+
+Each `DriveProfile` in a sweep is scored by replaying every trial in a
+headless, empty arena (so nothing the game puts in the arena gets in the
+way) and measuring how far the simulated robot strays from the recorded
+path. Profiles are spread across a pool of processes.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from math import atan2, cos, sin, sqrt
+
+import yaml
+
+from .batch import WorldBatch
+from .drive import DEFAULT_DRIVE_PROFILE, DriveProfile
+
+TIME_STEP = 1 / 30
+
+# The game trials are replayed in: an arena with nothing in it
+REPLAY_GAME = 'empty'
+
+# How many metres of position error one radian of heading error counts as
+DEFAULT_HEADING_WEIGHT = 0.25
+
+Trial = namedtuple('Trial', ('name', 'start', 'motors', 'path'))
+
+
+def load_trials(f):
+    """Read a list of `Trial`s from a YAML file."""
+    return [Trial(name=trial.get('name', 'trial {0}'.format(i)),
+                  start=tuple(trial['start']),
+                  motors=[tuple(phase) for phase in trial['motors']],
+                  path=[tuple(sample) for sample in trial['path']])
+            for i, trial in enumerate(yaml.safe_load(f))]
+
+
+def _scripted(motors):
+    schedule = []
+    for duration, m0, m1 in motors:
+        schedule.extend([(m0, m1)] * int(round(duration / TIME_STEP)))
+    schedule.append((0, 0))
+
+    def controller(robot, world):
+        step = min(int(round(world.time / TIME_STEP)), len(schedule) - 1)
+        robot.motors[0].m0.power, robot.motors[0].m1.power = schedule[step]
+    return controller
+
+
+def simulate(profile, trial, config=None):
+    """
+    Replay a trial with the given drive profile, and return the simulated
+    robot's (x, y, heading) at each of the times in the trial's path.
+    """
+    config = dict(config) if config is not None else dict()
+    config['game'] = REPLAY_GAME
+    config['drive'] = profile
+    world = WorldBatch(config)[0]
+    robot = world.add_robot(_scripted(trial.motors))
+    x, y, heading = trial.start
+    robot.location = (x, y)
+    robot.heading = heading
+
+    samples = []
+    step = 0
+    for sample_time, _, _, _ in trial.path:
+        while step < int(round(sample_time / TIME_STEP)):
+            world.step(TIME_STEP)
+            step += 1
+        if world.error is not None:
+            raise world.error
+        x, y = robot.location
+        samples.append((x, y, robot.heading))
+    return samples
+
+
+def path_error(profile, trials, config=None,
+               heading_weight=DEFAULT_HEADING_WEIGHT):
+    """
+    Root mean square distance, in metres, between where the trials' robots
+    went and where they go when simulated with `profile`.
+    """
+    total = 0.0
+    count = 0
+    for trial in trials:
+        simulated = simulate(profile, trial, config)
+        for (_, x, y, heading), (sim_x, sim_y, sim_heading) in \
+                zip(trial.path, simulated):
+            heading_error = atan2(sin(heading - sim_heading),
+                                  cos(heading - sim_heading))
+            total += ((x - sim_x) ** 2 + (y - sim_y) ** 2 +
+                      (heading_weight * heading_error) ** 2)
+            count += 1
+    return sqrt(total / count) if count else 0.0
+
+
+def profile_grid(**ranges):
+    """
+    Every combination of the given values for each of `DriveProfile`'s
+    fields, leaving any not given at their defaults.
+    """
+    fields = DriveProfile._fields
+    values = [ranges.pop(field, [getattr(DEFAULT_DRIVE_PROFILE, field)])
+              for field in fields]
+    if ranges:
+        raise ValueError("Unknown drive settings: {0}".format(
+            ', '.join(sorted(ranges))))
+    return [DriveProfile(*combination) for combination in product(*values)]
+
+
+def _score(args):
+    profile, trials, config, heading_weight = args
+    return path_error(profile, trials, config, heading_weight), profile
+
+
+def sweep(profiles, trials, config=None, workers=None,
+          heading_weight=DEFAULT_HEADING_WEIGHT):
+    """
+    Score every profile against the trials, across `workers` processes, and
+    return a list of (error, profile), best first.
+    """
+    jobs = [(profile, trials, config, heading_weight) for profile in profiles]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        scores = list(pool.map(_score, jobs))
+    scores.sort(key=lambda score: score[0])
+    return scores
@@ -0,0 +1,214 @@
+"""
+Accounting for the CPU time used by robot controller threads.
+
+Each controller thread gets a `CPUAccount`, measuring its own thread's CPU
+clock. Games can give controllers a budget with the `cpu_budget` option of
+their configuration, either as a number of CPU seconds per simulated second,
+or as a mapping of `CPUAccount`'s arguments:
+
+    cpu_budget:
+      budget: 0.25
+      action: suspend
+
+The budget is enforced whenever the controller calls into the robot API, and
+every so often while it runs, so that code which never touches the robot is
+held back too. A controller over its budget is either throttled (made to
+wait until simulated time catches up with its usage) or suspended for the
+rest of the match.
+"""
+import os
+import sys
+import threading
+import time
+
+THROTTLE = 'throttle'
+SUSPEND = 'suspend'
+
+# CPU seconds every controller may use on top of its budget, so that
+# starting up doesn't count against it
+DEFAULT_BURST = 0.5
+
+# How often a throttled controller checks whether it may carry on, in seconds
+THROTTLE_POLL_INTERVAL = 0.01
+
+# How often a watched thread's usage is looked at from outside, in seconds
+WATCH_INTERVAL = 0.05
+
+# The simulator's own code, which mustn't be stopped part way through
+_SIMULATOR_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _idle_trace(frame, event, arg):
+    # Tracing has to be on for a thread before other threads can hook its
+    # frames, but there's nothing to do until they do
+    return None
+
+
+class CPUAccount(object):
+    def __init__(self, arena, budget=None, action=THROTTLE,
+                 burst=DEFAULT_BURST):
+        if action not in (THROTTLE, SUSPEND):
+            raise ValueError("Unknown CPU budget action {0!r} (expected "
+                             "{1!r} or {2!r})".format(action, THROTTLE, SUSPEND))
+        self.arena = arena
+        self.budget = budget
+        self.action = action
+        self.burst = burst
+
+        self.thread_id = None
+        self._clock_id = None
+        self._start = 0.0
+        self._used = 0.0
+
+        self._checking = False
+
+        self.throttled = 0
+        self.throttled_for = 0.0
+        self.suspended = False
+        self._resume = threading.Event()
+
+    def start(self):
+        """Start measuring the calling thread."""
+        self.thread_id = threading.get_ident()
+        try:
+            self._clock_id = time.pthread_getcpuclockid(self.thread_id)
+        except (AttributeError, OSError):
+            # Not available on this platform; fall back to the last sample
+            # the thread took of itself
+            self._clock_id = None
+        self._start = time.thread_time()
+        self._used = 0.0
+
+    def watch(self):
+        """
+        Hold the calling thread to its budget even while it doesn't use the
+        robot API, say because it's stuck in a busy loop.
+
+        A watchdog thread checks the thread's usage every `WATCH_INTERVAL`,
+        and when it's over budget, hooks whatever code the thread is running
+        to make it call `checkpoint()`. Only a thread itself can turn on
+        tracing, which the hooks need, so the calling thread is traced from
+        now on. That slows it down, so threads without a budget aren't
+        watched.
+        """
+        if self.budget is None:
+            return
+        sys.settrace(_idle_trace)
+        watchdog = threading.Thread(target=self._watchdog)
+        watchdog.daemon = True
+        watchdog.start()
+
+    def _watchdog(self):
+        thread_id = self.thread_id
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                # The thread has finished
+                return
+            self.refresh()
+            if self._checking or not self._over_budget():
+                continue
+            # Stop the thread once it's back in its own code, rather than in
+            # the simulator's, where it could be holding the physics lock
+            while (frame is not None and
+                   frame.f_code.co_filename.startswith(_SIMULATOR_DIR)):
+                frame = frame.f_back
+            if frame is not None:
+                frame.f_trace_opcodes = True
+                frame.f_trace = self._hook
+
+    def _hook(self, frame, event, arg):
+        frame.f_trace_opcodes = False
+        self.checkpoint()
+        # Unhook the frame
+        return None
+
+    def sample(self):
+        """Update the usage from the calling thread, if it's the one measured."""
+        if threading.get_ident() == self.thread_id:
+            self._used = time.thread_time() - self._start
+
+    def refresh(self):
+        """
+        Update the usage, from the thread's CPU clock if another thread is
+        asking and the platform allows it.
+        """
+        if threading.get_ident() == self.thread_id:
+            self.sample()
+        elif self._clock_id is not None:
+            try:
+                self._used = time.clock_gettime(self._clock_id) - self._start
+            except OSError:
+                # The thread has finished
+                self._clock_id = None
+
+    @property
+    def used(self):
+        """CPU seconds used by the thread so far."""
+        self.refresh()
+        return self._used
+
+    @property
+    def allowance(self):
+        """CPU seconds the thread may have used by now, or None if unlimited."""
+        if self.budget is None:
+            return None
+        return self.budget * self.arena.time + self.burst
+
+    def _over_budget(self):
+        return self.budget is not None and self._used > self.allowance
+
+    def checkpoint(self):
+        """
+        Called by the measured thread whenever it uses the robot API, to
+        throttle or suspend it if it's over budget.
+        """
+        # Without a budget there's nothing to enforce, and the usage is only
+        # reported at the end, so the robot API doesn't pay for the clock
+        if self.budget is None or threading.get_ident() != self.thread_id:
+            return
+        self.sample()
+        if not self._over_budget():
+            return
+
+        self._checking = True
+        try:
+            if self.action == SUSPEND:
+                self.suspended = True
+                self._resume.wait()
+                self.suspended = False
+            else:
+                self.throttled += 1
+                started = time.time()
+                while self._over_budget():
+                    time.sleep(THROTTLE_POLL_INTERVAL)
+                self.throttled_for += time.time() - started
+        finally:
+            self._checking = False
+
+    def resume(self):
+        """Let a suspended thread carry on."""
+        self._resume.set()
+        self._resume.clear()
+
+    def __str__(self):
+        usage = "{0:.2f} CPU s".format(self.used)
+        if self.arena.time > 0:
+            usage += " ({0:.0%} of a core per simulated second)".format(
+                self.used / self.arena.time)
+        if self.suspended:
+            usage += ", suspended for going over budget"
+        elif self.throttled:
+            usage += ", throttled {0} times for {1:.1f} s".format(
+                self.throttled, self.throttled_for)
+        return usage
+
+
+def make_cpu_account(arena, config=None):
+    """Create a `CPUAccount` as described by a game's `cpu_budget` option."""
+    if config is None:
+        config = {}
+    elif not isinstance(config, dict):
+        config = {'budget': config}
+    return CPUAccount(arena, **config)
@@ -1,11 +1,46 @@
-
-from math import degrees
+from collections import OrderedDict
+from math import ceil, degrees, floor, hypot
 
 import pygame
 
+from .game_object import StaticObject
+
+# The scale sprites are drawn at
 PIXELS_PER_METER = 100
 
+# Unless told otherwise, windows are big enough to show the whole arena at
+# PIXELS_PER_METER, but no bigger than this.
+MAX_DEFAULT_RESOLUTION = (1000, 1000)
+
+# Each zoom level is this much closer than the one before
+ZOOM_STEP = 2 ** 0.25
+MIN_ZOOM_LEVEL = -4
+# 8 times closer than seeing the whole arena
+MAX_ZOOM_LEVEL = 12
+
+# The arena's background is drawn, and cached, in square tiles this many
+# pixels across, so only the part in view is ever drawn
+TILE_SIDE = 256
+
+# How many windows' worth of background tiles to keep around
+TILE_CACHE_WINDOWS = 3
+
+# The side of a cell of the index of sprites which never move, in metres
+SPRITE_CELL_SIZE = 1.0
+
+# How far one press of an arrow key moves the camera, as a fraction of the
+# window
+PAN_FRACTION = 0.1
+
+# How many steps `[` and `]` move through the arena's history
+REWIND_JUMP = 30
+
+OUTSIDE_ARENA_COLOUR = (0, 0, 0)
+
+CAPTION = "SourceBots Robot Simulator"
+
 sprites = {}
+scaled_sprites = {}
 
 
 def get_surface(name):
@@ -15,56 +50,343 @@ def get_surface(name):
     return sprites[name]
 
 
+def _cell(x, y):
+    return (int(floor(x / SPRITE_CELL_SIZE)), int(floor(y / SPRITE_CELL_SIZE)))
+
+
+def get_scaled_surface(name, scale):
+    """Return the named sprite, resized by `scale` (cached per scale)."""
+    if scale == 1:
+        return get_surface(name)
+
+    key = (name, scale)
+    if key not in scaled_sprites:
+        surface = get_surface(name)
+        width, height = surface.get_size()
+        size = (max(1, int(round(width * scale))),
+                max(1, int(round(height * scale))))
+        scaled_sprites[key] = pygame.transform.smoothscale(surface, size)
+
+    return scaled_sprites[key]
+
+
+class Camera(object):
+    """
+    Which part of the arena a `Display` shows: the point in the world at the
+    middle of the window, and how far zoomed in it is.
+
+    Zoom comes in discrete levels, each `ZOOM_STEP` times closer than the one
+    before, so that sprites and backgrounds only ever need drawing at a
+    handful of scales. At level 0 the whole arena fits in the window.
+    """
+
+    def __init__(self, base_scale, centre=(0, 0), zoom_level=0,
+                 max_zoom_level=MAX_ZOOM_LEVEL):
+        self.base_scale = base_scale
+        self.centre = centre
+        self.max_zoom_level = max_zoom_level
+        self.zoom_level = 0
+        self.zoom(zoom_level)
+        # Where `reset` goes back to
+        self._home = (self.centre, self.zoom_level)
+
+    @property
+    def pixels_per_meter(self):
+        return self.base_scale * ZOOM_STEP ** self.zoom_level
+
+    def zoom(self, levels):
+        level = max(MIN_ZOOM_LEVEL, self.zoom_level + levels)
+        if self.max_zoom_level is not None:
+            level = min(level, self.max_zoom_level)
+        self.zoom_level = level
+
+    def pan(self, dx, dy):
+        x, y = self.centre
+        self.centre = (x + dx, y + dy)
+
+    def reset(self):
+        self.centre, self.zoom_level = self._home
+
+
 class Display(object):
-    def __init__(self, arena):
+    def __init__(self, arena, resolution=None, zoom=0):
         self.arena = arena
         arena_w, arena_h = self.arena.size
-        self.size = (arena_w * PIXELS_PER_METER, arena_h * PIXELS_PER_METER)
+        if resolution is None:
+            max_w, max_h = MAX_DEFAULT_RESOLUTION
+            resolution = (min(arena_w * PIXELS_PER_METER, max_w),
+                          min(arena_h * PIXELS_PER_METER, max_h))
+        self.size = tuple(int(side) for side in resolution)
+
+        base_scale = min(self.size[0] / arena_w, self.size[1] / arena_h)
+        self.camera = Camera(base_scale, zoom_level=zoom)
+
+        self._tiles = OrderedDict()
+        tiles_in_window = ((ceil(self.size[0] / TILE_SIDE) + 1) *
+                           (ceil(self.size[1] / TILE_SIDE) + 1))
+        self._tile_cache_size = TILE_CACHE_WINDOWS * tiles_in_window
+        # Where the tile being drawn starts on the background, if any
+        self._tile_origin = (0, 0)
+
+        # Sprites which never move, by cell, and objects which might move
+        self._static_sprites = {}
+        self._static_reach = 0
+        self._moving_objects = []
+        self._objects_seen = 0
+
+        # While paused, the arena isn't ticked, and the display can show any
+        # step in the arena's history: `rewind_age` steps before the latest
+        self.paused = False
+        self.rewind_age = 0
 
         pygame.display.init()
         self._window = pygame.display.set_mode(self.size)
-        pygame.display.set_caption("SourceBots Robot Simulator")
+        pygame.display.set_caption(CAPTION)
         self._screen = pygame.display.get_surface()
-        self._draw_background()
         self._draw()
 
     def __del__(self):
         pygame.display.quit()
 
-    def _draw_background(self):
-        self._background = pygame.Surface(self.size)
-        self.arena.draw_background(self._background, self)
+    @property
+    def scale(self):
+        """The number of pixels per metre things are currently drawn at."""
+        return self.camera.pixels_per_meter
+
+    def _get_tile(self, key, background_size):
+        try:
+            tile = self._tiles.pop(key)
+        except KeyError:
+            _, column, row = key
+            left, top = column * TILE_SIDE, row * TILE_SIDE
+            background_w, background_h = background_size
+            # Tiles along the far edges only cover what's left of the arena
+            tile = pygame.Surface((min(TILE_SIDE, background_w - left),
+                                   min(TILE_SIDE, background_h - top)))
+            self._tile_origin = (left, top)
+            try:
+                self.arena.draw_background(tile, self)
+            finally:
+                self._tile_origin = (0, 0)
+            if len(self._tiles) >= self._tile_cache_size:
+                self._tiles.popitem(last=False)
+        # Most recently used last
+        self._tiles[key] = tile
+        return tile
+
+    def _draw_background(self, origin_x, origin_y):
+        scale = self.scale
+        arena_w, arena_h = self.arena.size
+        background_size = (int(ceil(arena_w * scale)),
+                           int(ceil(arena_h * scale)))
+        window_w, window_h = self.size
+
+        # The tiles which overlap the window
+        columns = range(max(0, origin_x // TILE_SIDE),
+                        min(ceil(background_size[0] / TILE_SIDE),
+                            ceil((origin_x + window_w) / TILE_SIDE)))
+        rows = range(max(0, origin_y // TILE_SIDE),
+                     min(ceil(background_size[1] / TILE_SIDE),
+                         ceil((origin_y + window_h) / TILE_SIDE)))
+        for column in columns:
+            for row in rows:
+                tile = self._get_tile((scale, column, row), background_size)
+                self._screen.blit(tile, (column * TILE_SIDE - origin_x,
+                                         row * TILE_SIDE - origin_y))
+
+    def _index_sprites(self):
+        # Arenas only ever gain objects, so only new ones need sorting out
+        objects = self.arena.objects
+        for obj in objects[self._objects_seen:]:
+            if not isinstance(obj, StaticObject):
+                self._moving_objects.append(obj)
+            elif obj.surface_name is not None:
+                x, y = obj.location
+                self._static_sprites.setdefault(_cell(x, y), []).append(obj)
+                # How far, in metres, the sprite can reach from its location
+                width, height = get_surface(obj.surface_name).get_size()
+                self._static_reach = max(self._static_reach,
+                                         hypot(width, height) / 2 /
+                                         PIXELS_PER_METER)
+        self._objects_seen = len(objects)
+
+    def _static_sprites_near(self, origin_x, origin_y):
+        # Static sprites in the cells which the window, widened by how far
+        # a sprite can reach, covers. They're all in the arena.
+        arena = self.arena
+        scale = self.scale
+        reach = self._static_reach
+        window_w, window_h = self.size
+        offset_x, offset_y = arena.size[0] / 2, arena.size[1] / 2
+        min_cx, min_cy = _cell(
+            max(origin_x / scale - offset_x, arena.left) - reach,
+            max(origin_y / scale - offset_y, arena.top) - reach)
+        max_cx, max_cy = _cell(
+            min((origin_x + window_w) / scale - offset_x, arena.right) + reach,
+            min((origin_y + window_h) / scale - offset_y, arena.bottom) + reach)
+        grid = self._static_sprites
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                for obj in grid.get((cx, cy), ()):
+                    yield obj
+
+    def _view_origin(self):
+        # The point on the background at the top left of the window
+        centre_x, centre_y = self.to_pixel_coord(self.camera.centre)
+        return (centre_x - self.size[0] / 2, centre_y - self.size[1] / 2)
+
+    def _draw_sprite(self, name, location, heading, origin, sprite_scale):
+        x, y = self.to_pixel_coord(location)
+        surface = get_scaled_surface(name, sprite_scale)
+        x -= origin[0]
+        y -= origin[1]
+
+        # Skip anything which, however it's rotated, is out of view
+        object_width, object_height = surface.get_size()
+        radius = hypot(object_width, object_height) / 2
+        window_w, window_h = self.size
+        if (x + radius < 0 or x - radius > window_w or
+                y + radius < 0 or y - radius > window_h):
+            return
+
+        surface = pygame.transform.rotate(surface, -degrees(heading))
+        object_width, object_height = surface.get_size()
+        screen_location = (x - object_width / 2, y - object_height / 2)
+        self._screen.blit(surface, screen_location)
 
     def _draw(self):
-        self._screen.blit(self._background, (0, 0))
+        origin_x, origin_y = self._view_origin()
+        # Whole pixels, so that the background's tiles meet exactly
+        origin = (int(round(origin_x)), int(round(origin_y)))
+        sprite_scale = self.scale / PIXELS_PER_METER
+
+        self._screen.fill(OUTSIDE_ARENA_COLOUR)
+        self._draw_background(*origin)
+
+        if len(self.arena.objects) != self._objects_seen:
+            self._index_sprites()
 
-        for obj in self.arena.objects:
-            if obj.surface_name is None:
+        # Static objects don't move, and aren't rewound
+        for obj in self._static_sprites_near(*origin):
+            self._draw_sprite(obj.surface_name, obj.location, obj.heading,
+                              origin, sprite_scale)
+
+        if self.rewind_age:
+            rewound = self.arena.history.poses_at(self.rewind_age)
+        else:
+            rewound = None
+
+        for obj in self._moving_objects:
+            name = obj.surface_name
+            if name is None:
                 continue
-            with obj.lock:
-                heading = -degrees(obj.heading)
-                x, y = self.to_pixel_coord(obj.location)
-            surface = get_surface(obj.surface_name)
-            surface = pygame.transform.rotate(surface, heading)
-            object_width, object_height = surface.get_size()
-            screen_location = (x - object_width / 2, y - object_height / 2)
-            self._screen.blit(surface, screen_location)
+            if rewound is not None and obj in rewound:
+                location, heading = rewound[obj]
+            else:
+                with obj.lock:
+                    location, heading = obj.location, obj.heading
+            self._draw_sprite(name, location, heading, origin, sprite_scale)
 
         pygame.display.flip()
 
+    def _update_caption(self):
+        caption = CAPTION
+        if self.paused:
+            if self.rewind_age:
+                history = self.arena.history
+                caption += " (paused, {0:.2f} s ago)".format(
+                    history.time_at(0) - history.time_at(self.rewind_age))
+            else:
+                caption += " (paused)"
+        pygame.display.set_caption(caption)
+
     ## Public Methods ##
 
     def tick(self, time_passed):
-        self.arena.tick(time_passed)
+        if not self.paused:
+            self.arena.tick(time_passed)
         # TODO: Allow multiple displays on one arena without them all ticking it
         self._draw()
 
+    def pause(self, paused=True):
+        """Stop (or restart) ticking the arena. Restarting ends any rewind."""
+        self.paused = paused
+        if not paused:
+            self.rewind_age = 0
+        self._update_caption()
+
+    def rewind(self, steps):
+        """
+        Pause, and show the arena `steps` steps further back in its history
+        (or forward, if negative).
+        """
+        history = self.arena.history
+        if history is None or not len(history):
+            return
+        self.paused = True
+        self.rewind_age = max(0, min(self.rewind_age + steps,
+                                     len(history) - 1))
+        self._update_caption()
+
+    def handle_event(self, event):
+        """
+        Move the camera in response to arrow keys, +, - and 0. Space pauses
+        and resumes the match, and `,` and `.` (or `[` and `]`, for bigger
+        jumps) scrub back and forth while paused.
+        """
+        if event.type != pygame.KEYDOWN:
+            return
+
+        pan_x = PAN_FRACTION * self.size[0] / self.scale
+        pan_y = PAN_FRACTION * self.size[1] / self.scale
+        if event.key == pygame.K_LEFT:
+            self.camera.pan(-pan_x, 0)
+        elif event.key == pygame.K_RIGHT:
+            self.camera.pan(pan_x, 0)
+        elif event.key == pygame.K_UP:
+            self.camera.pan(0, -pan_y)
+        elif event.key == pygame.K_DOWN:
+            self.camera.pan(0, pan_y)
+        elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+            self.camera.zoom(1)
+        elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.camera.zoom(-1)
+        elif event.key in (pygame.K_0, pygame.K_KP0):
+            self.camera.reset()
+        elif event.key == pygame.K_SPACE:
+            self.pause(not self.paused)
+        elif event.key == pygame.K_COMMA:
+            self.rewind(1)
+        elif event.key == pygame.K_PERIOD:
+            self.rewind(-1)
+        elif event.key == pygame.K_LEFTBRACKET:
+            self.rewind(REWIND_JUMP)
+        elif event.key == pygame.K_RIGHTBRACKET:
+            self.rewind(-REWIND_JUMP)
+
+    def sprite(self, name):
+        """Return the named sprite, scaled to how things are being drawn."""
+        return get_scaled_surface(name, self.scale / PIXELS_PER_METER)
+
     def to_pixel_coord(self, world_coord, arena=None):
+        """
+        Convert a point in the world to a pixel on the arena's background, at
+        the current scale. While a tile of the background is being drawn, the
+        pixel is on that tile.
+        """
         if arena is None:
             arena = self.arena
         offset_x = arena.size[0] / 2
         offset_y = arena.size[1] / 2
         x, y = world_coord
-        x, y = ((x + offset_x) * PIXELS_PER_METER,
-                (y + offset_y) * PIXELS_PER_METER)
+        scale = self.scale
+        tile_x, tile_y = self._tile_origin
+        x, y = ((x + offset_x) * scale - tile_x,
+                (y + offset_y) * scale - tile_y)
         return (x, y)
+
+    def to_screen_coord(self, world_coord):
+        """Convert a point in the world to a pixel in the window."""
+        x, y = self.to_pixel_coord(world_coord)
+        origin_x, origin_y = self._view_origin()
+        return (x - origin_x, y - origin_y)
@@ -0,0 +1,43 @@
+"""
+How robots' wheels turn motor power into motion.
+
+Games can tune the model to match real robots with the `drive` option of
+their configuration, giving any of `DriveProfile`'s fields:
+
+    drive:
+      force_scale: 0.55
+      right_bias: 1.02
+
+`calibrate.py` searches for the profile which best reproduces paths recorded
+from a real robot.
+"""
+from collections import namedtuple
+
+
+class DriveProfile(namedtuple('DriveProfile', ('force_scale', 'friction',
+                                               'right_bias'))):
+    """
+    * `force_scale`: newtons of force per unit of motor power;
+    * `friction`: newtons of drag per m/s of wheel speed;
+    * `right_bias`: how much stronger the right motor is than the left.
+    """
+    __slots__ = ()
+
+
+DEFAULT_DRIVE_PROFILE = DriveProfile(force_scale=0.6,
+                                     friction=50.2,
+                                     right_bias=1.05)
+
+
+def make_drive_profile(config=None):
+    """Create the `DriveProfile` described by a game's configuration."""
+    if config is None:
+        return DEFAULT_DRIVE_PROFILE
+    if isinstance(config, DriveProfile):
+        return config
+    try:
+        return DEFAULT_DRIVE_PROFILE._replace(**config)
+    except ValueError:
+        raise ValueError("Unknown drive settings in {0!r} (expected some of "
+                         "{1})".format(config,
+                                       ', '.join(DriveProfile._fields)))
@@ -1,15 +1,108 @@
 import threading
 
+# Guards the lazy creation of per-object locks
+_lock_creation_lock = threading.Lock()
+
 
 class GameObject(object):
+    __slots__ = ('arena', 'location', 'heading', '_lock')
+
     surface_name = None
     marker_info = None
     grabbable = False
+    # Whether the object blocks robots' view of markers. Opaque objects
+    # have `bounds`, an axis aligned (min_x, min_y, max_x, max_y) box.
+    opaque = False
+    # Whether the object is a robot with a camera
+    can_see = False
 
-    def __init__(self, arena):
+    def __init__(self, arena, location=(0, 0), heading=0):
         self.arena = arena
 
-        self.location = (0, 0)
-        self.heading = 0
+        self._place(location, heading)
+
+        self._lock = None
+
+    def _place(self, location, heading):
+        self.location = location
+        self.heading = heading
+
+    @property
+    def lock(self):
+        # Most objects are never locked by anything other than the display, so
+        # the lock is only created the first time somebody asks for it.
+        lock = self._lock
+        if lock is None:
+            with _lock_creation_lock:
+                if self._lock is None:
+                    self._lock = threading.RLock()
+                lock = self._lock
+        return lock
+
+    def faces(self, x, y):
+        """Whether the object's marker can be seen from the point (x, y)."""
+        return True
+
+
+# Where GameObject keeps its location and heading
+_location_slot = GameObject.location
+_heading_slot = GameObject.heading
+_POSE_ATTRIBUTES = frozenset(('location', 'heading'))
+
+
+class StaticObject(GameObject):
+    """
+    A game object which stays wherever it's put when it's created. Its
+    location and heading can't be changed afterwards.
+    """
+
+    __slots__ = ()
+
+    # Static objects all share one lock, rather than each having their own
+    lock = threading.RLock()
+
+    def __setattr__(self, name, value):
+        # Only the pose is guarded, so reading it stays a plain slot lookup
+        if name in _POSE_ATTRIBUTES:
+            raise AttributeError("Static objects can't be moved once created")
+        super().__setattr__(name, value)
+
+    def _place(self, location, heading):
+        _location_slot.__set__(self, location)
+        _heading_slot.__set__(self, heading)
+
+
+class PhysicsObject(GameObject):
+    """A game object whose location and heading belong to a physics body."""
+
+    __slots__ = ('_body',)
+
+    @property
+    def location(self):
+        return self._body.position
+
+    @location.setter
+    def location(self, new_pos):
+        self._body.position = new_pos
+        # Moving a body doesn't wake it, but anything watching for movement
+        # should see it
+        self._body.awake = True
+
+    @property
+    def heading(self):
+        return self._body.angle
+
+    @heading.setter
+    def heading(self, new_heading):
+        self._body.angle = new_heading
+        self._body.awake = True
+
+    @property
+    def asleep(self):
+        """Whether the physics engine has the object at rest, unmoved."""
+        return not self._body.awake
 
-        self.lock = threading.RLock()
+    def __init__(self, arena, body):
+        self._body = body
+        body.user_data = self
+        super(PhysicsObject, self).__init__(arena)
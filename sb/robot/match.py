@@ -0,0 +1,235 @@
+"""
+Running a match: robot scripts, each in its own thread, driving simulated
+robots through an imitation of the real robot API.
+
+Compiled robot scripts are cached by the hash of their source, so a process
+which runs many matches (or forks a worker per match, like `serve.py`) only
+compiles each version of a script once.
+"""
+import hashlib
+import math
+import sys
+import threading
+from collections import OrderedDict
+
+import six
+
+from .cpu import make_cpu_account
+from .sim_robot import SimRobot
+from .simulator import Simulator
+from .vision import MARKER_ARENA, MARKER_TOKEN
+
+# How many compiled scripts to keep
+SCRIPT_CACHE_SIZE = 64
+
+_compiled_scripts = OrderedDict()
+
+
+def compile_script(path):
+    """
+    Compile the robot script at `path`, reusing the code object from last
+    time if its contents haven't changed.
+    """
+    with open(path, 'rb') as f:
+        source = f.read()
+    # Code objects remember their file name, for tracebacks
+    key = (hashlib.sha256(source).hexdigest(), path)
+    code = _compiled_scripts.pop(key, None)
+    if code is None:
+        code = compile(source, path, 'exec')
+        if len(_compiled_scripts) >= SCRIPT_CACHE_SIZE:
+            _compiled_scripts.popitem(last=False)
+    # Most recently used last
+    _compiled_scripts[key] = code
+    return code
+
+
+## BEGIN SMALLPEICE HACKS
+
+class Motor(object):
+    def __init__(self, robot, channel):
+        self.robot = robot
+        self.channel = channel
+
+    def __str__(self):
+        return "Motor({})".format(self.channel)
+
+    __repr__ = __str__
+
+    VOLTAGE_SCALE = 1
+
+    def _get_channel(self):
+        motor_board = self.robot.sim_robot.motors[0]
+
+        if self.channel == 0:
+            return motor_board.m0
+        else:
+            return motor_board.m1
+
+    @property
+    def voltage(self):
+        return self.VOLTAGE_SCALE * (self._get_channel().power / 100)
+
+    @voltage.setter
+    def voltage(self, new_voltage):
+        new_power = 100 * (new_voltage / self.VOLTAGE_SCALE)
+        self._get_channel().power = new_power
+
+class MotorBoard(object):
+    def __init__(self, robot):
+        self.robot = robot
+        self.m0 = Motor(self.robot, 0)
+        self.m1 = Motor(self.robot, 1)
+
+    def __str__(self):
+        return "MotorBoard"
+
+    __repr__ = __str__
+
+class ServoBoard(object):
+    def __init__(self, robot):
+        self.robot = robot
+
+    def __str__(self):
+        return "ServoBoard"
+
+    __repr__ = __str__
+
+    ULTRASOUND_ANGLES = {
+        (6, 7): ('ahead', 0),
+        (8, 9): ('right', math.pi / 2),
+        (10, 11): ('left', -math.pi / 2),
+    }
+
+    def read_ultrasound(self, trigger_pin, echo_pin):
+        pin_pair = (trigger_pin, echo_pin)
+
+        try:
+            _, angle_offset = self.ULTRASOUND_ANGLES[pin_pair]
+        except KeyError:
+            print("There's no ultrasound module on those pins. Try:")
+            for (
+                (trigger_pin, echo_pin),
+                (direction, _),
+            ) in self.ULTRASOUND_ANGLES.items():
+                print("Pins {} and {} for the sensor pointing {}".format(
+                    trigger_pin,
+                    echo_pin,
+                    direction,
+                ))
+            return 0.0
+
+        result = self.robot.sim_robot.send_ultrasound_ping(angle_offset)
+
+        if result is None:
+            # No detection is equivalent to just not getting an echo response
+            result = 0.0
+
+        return result
+
+class MockedRobot(object):
+    def __init__(self, sim_robot):
+        self.sim_robot = sim_robot
+        self.motor_board = MotorBoard(self)
+        self.servo_board = ServoBoard(self)
+
+    def __str__(self):
+        return "Robot"
+
+    __repr__ = __str__
+
+    def see(self, res=(800, 600)):
+        return self.sim_robot.see(res)
+
+    @property
+    def motor_boards(self):
+        return {'bees': self.motor_board}
+
+    @property
+    def servo_boards(self):
+        return {'bees': self.motor_board}
+
+
+
+## END SMALLPEICE HACKS
+
+
+class RobotThread(threading.Thread):
+    def __init__(self, sim, zone, script, cpu_budget=None, *args, **kwargs):
+        super(RobotThread, self).__init__(*args, **kwargs)
+        self.sim = sim
+        self.zone = zone
+        self.script = script
+        try:
+            self.code = compile_script(script)
+        except (OSError, SyntaxError, ValueError) as e:
+            # Only this robot fails, once its thread starts, leaving the
+            # others to play the match
+            self.code = None
+            self._load_error = e
+        self.daemon = True
+        self.cpu_account = make_cpu_account(sim.arena, cpu_budget)
+        self.sim_robot = None
+
+    def run(self):
+        if self.code is None:
+            raise self._load_error
+        self.cpu_account.start()
+        self.cpu_account.watch()
+        sim = self.sim
+
+        def robot():
+            with sim.arena.physics_lock:
+                robot_object = SimRobot(sim)
+                robot_object.zone = self.zone
+                robot_object.cpu_account = self.cpu_account
+                robot_object.location = sim.arena.start_locations[self.zone]
+                robot_object.heading = sim.arena.start_headings[self.zone]
+                self.sim_robot = robot_object
+                return MockedRobot(robot_object)
+
+        try:
+            six.exec_(self.code, {
+                'Robot': robot,
+                'MARKER_ARENA': MARKER_ARENA,
+                'MARKER_TOKEN': MARKER_TOKEN,
+            })
+        finally:
+            sys.settrace(None)
+            self.cpu_account.sample()
+
+
+def run_match(config, robot_scripts):
+    """
+    Run a match of the game described by a (parsed YAML) config between the
+    given robot scripts, one per starting zone, until the window is closed.
+    Returns the scripts' threads, some of which may still be running.
+    """
+    config = dict(config) if config is not None else dict()
+    cpu_budget = config.pop('cpu_budget', None)
+
+    sim = Simulator(config, background=False)
+
+    threads = []
+    for zone, script in enumerate(robot_scripts):
+        thread = RobotThread(sim, zone, script, cpu_budget)
+        thread.start()
+        threads.append(thread)
+
+    sim.run()
+
+    print("CPU time used by each robot:")
+    for thread in threads:
+        print("  Zone {0} ({1}): {2}".format(thread.zone, thread.script,
+                                            thread.cpu_account))
+
+    print("Motor commands sent by each robot:")
+    for thread in threads:
+        if thread.sim_robot is None:
+            continue
+        print("  Zone {0} ({1}):".format(thread.zone, thread.script))
+        motor_board = thread.sim_robot.motors[0]
+        for name, channel in (('m0', motor_board.m0), ('m1', motor_board.m1)):
+            print("    {0}: {1}".format(name, channel))
+
+    return threads
@@ -0,0 +1,55 @@
+"""
+Physics backends.
+
+Everything the simulator needs from a physics engine goes through the
+`PhysicsWorld` interface in `.backend`. Backends are looked up by name; the
+default picks the fastest one that can be imported.
+"""
+import importlib
+
+from .backend import (STATIC, KINEMATIC, DYNAMIC, CATEGORY_WALL,
+                      CATEGORY_TOKEN, CATEGORY_ROBOT, ALL_CATEGORIES,
+                      ContactEvent, PhysicsWorld, RayCastHit)
+
+# In order of preference
+BACKENDS = (
+    ('box2d', '.box2d_backend'),
+    ('pypybox2d', '.pypybox2d_backend'),
+)
+
+
+def get_backend(name=None):
+    """
+    Return the `PhysicsWorld` class of the named backend, or of the first
+    available backend if `name` is None or 'auto'.
+    """
+    if name in (None, 'auto'):
+        for candidate, _ in BACKENDS:
+            try:
+                return get_backend(candidate)
+            except ImportError:
+                continue
+        raise ImportError("No physics backend is available. Install "
+                          "either Box2D or pypybox2d.")
+
+    modules = dict(BACKENDS)
+    if name not in modules:
+        raise ValueError("Unknown physics backend {0!r} (expected one of "
+                         "{1})".format(name, ', '.join(modules)))
+    return importlib.import_module(modules[name], __name__).World
+
+
+__all__ = [
+    'STATIC',
+    'KINEMATIC',
+    'DYNAMIC',
+    'CATEGORY_WALL',
+    'CATEGORY_TOKEN',
+    'CATEGORY_ROBOT',
+    'ALL_CATEGORIES',
+    'BACKENDS',
+    'ContactEvent',
+    'PhysicsWorld',
+    'RayCastHit',
+    'get_backend',
+]
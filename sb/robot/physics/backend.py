@@ -0,0 +1,105 @@
+from collections import namedtuple
+
+STATIC = 'static'
+KINEMATIC = 'kinematic'
+DYNAMIC = 'dynamic'
+
+# Collision categories, for fixtures' `category_bits` and `mask_bits`
+CATEGORY_WALL = 0x0001
+CATEGORY_TOKEN = 0x0002
+CATEGORY_ROBOT = 0x0004
+ALL_CATEGORIES = 0xFFFF
+
+# A single ray cast intersection. `fraction` is how far along the ray the
+# intersection is, from 0 at the start to 1 at the end.
+RayCastHit = namedtuple('RayCastHit', ('body', 'point', 'fraction'))
+
+# Two fixtures starting (`began`) or ceasing to touch. `a` and `b` are the
+# objects owning them, in no particular order: each fixture's `user_data`, or
+# its body's if the fixture has none.
+ContactEvent = namedtuple('ContactEvent', ('began', 'a', 'b'))
+
+
+class PhysicsWorld(object):
+    """
+    A physics world, as used by the simulator.
+
+    Bodies returned by `create_body` follow pypybox2d's naming, and provide:
+
+    * `position`, `angle`, `linear_velocity`, `angular_velocity`, `active`,
+      `awake` and `user_data` (all settable), `world_center` and `mass`;
+    * `create_polygon_fixture(vertices, density, friction, restitution,
+      category_bits, mask_bits, user_data)`, returning a fixture which can be
+      passed to `destroy_fixture(fixture)`. Fixtures only need `user_data`
+      when something other than their body's owner owns them;
+    * `get_world_point`, `get_world_vector`, `get_local_vector` and
+      `get_linear_velocity_from_local_point`;
+    * `apply_force(force, point)` and `apply_linear_impulse(impulse, point)`.
+
+    Vectors support indexing and unpacking, but no arithmetic.
+    """
+
+    # The name this backend is registered under
+    name = None
+
+    # Whether `step` releases the GIL, so that separate worlds can usefully
+    # be stepped from separate threads
+    releases_gil = False
+
+    def __init__(self):
+        # Maps each category to the categories it's watched against
+        self._watched_contacts = {}
+        self._contact_events = []
+
+    def create_body(self, position=(0, 0), angle=0, type=DYNAMIC,
+                    linear_damping=0.0, angular_damping=0.0):
+        raise NotImplementedError()
+
+    def step(self, time_passed, vel_iters, pos_iters):
+        """
+        Advance the world by `time_passed` seconds, and return the list of
+        `ContactEvent`s for watched pairs of categories raised since the
+        last step.
+        """
+        raise NotImplementedError()
+
+    def watch_contacts(self, category_a, category_b):
+        """
+        Start reporting contacts between fixtures in `category_a` and
+        fixtures in `category_b`. Contacts between any other categories are
+        dropped before an event is ever created.
+        """
+        if not self._watched_contacts:
+            self._install_contact_listener()
+        watched = self._watched_contacts
+        watched[category_a] = watched.get(category_a, 0) | category_b
+        watched[category_b] = watched.get(category_b, 0) | category_a
+
+    def _install_contact_listener(self):
+        raise NotImplementedError()
+
+    def _contact(self, began, category_a, owner_a, category_b, owner_b):
+        # Called by the backend's contact listener for every contact
+        if self._watched_contacts.get(category_a, 0) & category_b:
+            self._contact_events.append(ContactEvent(began, owner_a, owner_b))
+
+    def _take_contact_events(self):
+        events = self._contact_events
+        if events:
+            self._contact_events = []
+        return events
+
+    def ray_cast(self, start, end):
+        """
+        Return a `RayCastHit` for every fixture the ray from `start` to `end`
+        passes through, in no particular order. Fixtures containing `start`
+        are ignored.
+        """
+        raise NotImplementedError()
+
+    def create_weld_joint(self, body_a, body_b, local_anchor_a,
+                          local_anchor_b):
+        raise NotImplementedError()
+
+    def destroy_joint(self, joint):
+        raise NotImplementedError()
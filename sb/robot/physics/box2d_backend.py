@@ -0,0 +1,191 @@
+"""Physics backend using the compiled Box2D bindings (the `box2d` package)."""
+import Box2D
+
+from .backend import STATIC, KINEMATIC, DYNAMIC, PhysicsWorld, RayCastHit
+
+BODY_TYPES = {
+    STATIC: Box2D.b2_staticBody,
+    KINEMATIC: Box2D.b2_kinematicBody,
+    DYNAMIC: Box2D.b2_dynamicBody,
+}
+
+
+class Body(object):
+    """Adapts a `Box2D.b2Body` to pypybox2d's naming."""
+
+    __slots__ = ('_body', 'user_data')
+
+    def __init__(self, body):
+        self._body = body
+        self.user_data = None
+        body.userData = self
+
+    @property
+    def position(self):
+        return self._body.position
+
+    @position.setter
+    def position(self, new_pos):
+        self._body.position = tuple(new_pos)
+
+    @property
+    def angle(self):
+        return self._body.angle
+
+    @angle.setter
+    def angle(self, new_angle):
+        self._body.angle = new_angle
+
+    @property
+    def world_center(self):
+        return self._body.worldCenter
+
+    @property
+    def linear_velocity(self):
+        return self._body.linearVelocity
+
+    @linear_velocity.setter
+    def linear_velocity(self, velocity):
+        self._body.linearVelocity = tuple(velocity)
+
+    @property
+    def angular_velocity(self):
+        return self._body.angularVelocity
+
+    @angular_velocity.setter
+    def angular_velocity(self, velocity):
+        self._body.angularVelocity = velocity
+
+    @property
+    def active(self):
+        return self._body.active
+
+    @active.setter
+    def active(self, active):
+        self._body.active = active
+
+    @property
+    def awake(self):
+        return self._body.awake
+
+    @awake.setter
+    def awake(self, awake):
+        self._body.awake = awake
+
+    @property
+    def mass(self):
+        return self._body.mass
+
+    def create_polygon_fixture(self, vertices, density=0.0, friction=0.2,
+                               restitution=0.0, category_bits=0x0001,
+                               mask_bits=0xFFFF, user_data=None):
+        return self._body.CreatePolygonFixture(vertices=vertices,
+                                               density=density,
+                                               friction=friction,
+                                               restitution=restitution,
+                                               categoryBits=category_bits,
+                                               maskBits=mask_bits,
+                                               userData=user_data)
+
+    def destroy_fixture(self, fixture):
+        self._body.DestroyFixture(fixture)
+
+    def get_world_point(self, local_point):
+        return self._body.GetWorldPoint(local_point)
+
+    def get_world_vector(self, local_vector):
+        return self._body.GetWorldVector(local_vector)
+
+    def get_local_vector(self, world_vector):
+        return self._body.GetLocalVector(world_vector)
+
+    def get_linear_velocity_from_local_point(self, local_point):
+        return self._body.GetLinearVelocityFromLocalPoint(local_point)
+
+    def apply_force(self, force, point):
+        self._body.ApplyForce(force, point, True)
+
+    def apply_linear_impulse(self, impulse, point):
+        self._body.ApplyLinearImpulse(impulse, point, True)
+
+
+class _AllHits(Box2D.b2RayCastCallback):
+    def __init__(self):
+        super(_AllHits, self).__init__()
+        self.hits = []
+
+    def ReportFixture(self, fixture, point, normal, fraction):
+        self.hits.append(RayCastHit(fixture.body.userData,
+                                    tuple(point),
+                                    fraction))
+        # Don't clip the ray, so that every fixture along it is reported
+        return 1
+
+
+class _ContactRecorder(Box2D.b2ContactListener):
+    def __init__(self, world):
+        super(_ContactRecorder, self).__init__()
+        self._world = world
+
+    @staticmethod
+    def _owner(fixture):
+        owner = fixture.userData
+        if owner is None:
+            owner = fixture.body.userData.user_data
+        return owner
+
+    def _report(self, began, contact):
+        fixture_a = contact.fixtureA
+        fixture_b = contact.fixtureB
+        self._world._contact(began,
+                             fixture_a.filterData.categoryBits,
+                             self._owner(fixture_a),
+                             fixture_b.filterData.categoryBits,
+                             self._owner(fixture_b))
+
+    def BeginContact(self, contact):
+        self._report(True, contact)
+
+    def EndContact(self, contact):
+        self._report(False, contact)
+
+
+class World(PhysicsWorld):
+    name = 'box2d'
+
+    def __init__(self):
+        super(World, self).__init__()
+        self._world = Box2D.b2World(gravity=(0, 0))
+
+    def create_body(self, position=(0, 0), angle=0, type=DYNAMIC,
+                    linear_damping=0.0, angular_damping=0.0):
+        body = self._world.CreateBody(type=BODY_TYPES[type],
+                                      position=tuple(position),
+                                      angle=angle,
+                                      linearDamping=linear_damping,
+                                      angularDamping=angular_damping)
+        return Body(body)
+
+    def step(self, time_passed, vel_iters, pos_iters):
+        self._world.Step(time_passed, vel_iters, pos_iters)
+        return self._take_contact_events()
+
+    def _install_contact_listener(self):
+        self._world.contactListener = _ContactRecorder(self)
+
+    def ray_cast(self, start, end):
+        callback = _AllHits()
+        self._world.RayCast(callback, tuple(start), tuple(end))
+        return callback.hits
+
+    def create_weld_joint(self, body_a, body_b, local_anchor_a,
+                          local_anchor_b):
+        return self._world.CreateWeldJoint(
+            bodyA=body_a._body,
+            bodyB=body_b._body,
+            localAnchorA=local_anchor_a,
+            localAnchorB=local_anchor_b,
+            referenceAngle=body_b.angle - body_a.angle)
+
+    def destroy_joint(self, joint):
+        self._world.DestroyJoint(joint)
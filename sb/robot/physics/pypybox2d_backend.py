@@ -0,0 +1,138 @@
+"""Physics backend using pypybox2d, a pure Python port of Box2D."""
+
+# Begin Python 3 compatibility hax
+
+import functools
+import pypybox2d.shapes
+
+pypybox2d.shapes.reduce = functools.reduce
+
+# End Python 3 compatibility hax
+
+import pypybox2d
+
+# Begin deactivation hax
+#
+# Deactivating a body destroys its contacts while iterating over the list it
+# removes them from, so every other contact is left behind, pointing at
+# fixtures with no broad-phase proxies. Destroy them properly first. The
+# destroyed proxies are also left in their fixtures' lists, which stops the
+# body being moved or reactivated later.
+
+_set_body_active = pypybox2d.body.Body.active.fset
+
+
+def _set_body_active_fixed(body, active):
+    world = body._world
+    if not active and world is not None and not world.locked:
+        for contact in list(body._contacts):
+            world.contact_manager.destroy(contact)
+    _set_body_active(body, active)
+
+
+pypybox2d.body.Body.active = pypybox2d.body.Body.active.setter(
+    _set_body_active_fixed)
+
+_destroy_proxies = pypybox2d.fixture.Fixture._destroy_proxies
+
+
+def _destroy_proxies_fixed(fixture, broadphase):
+    _destroy_proxies(fixture, broadphase)
+    fixture._proxies = []
+
+
+pypybox2d.fixture.Fixture._destroy_proxies = _destroy_proxies_fixed
+
+# End deactivation hax
+
+from .backend import STATIC, KINEMATIC, DYNAMIC, PhysicsWorld, RayCastHit
+
+BODY_TYPES = {
+    STATIC: pypybox2d.body.Body.STATIC,
+    KINEMATIC: pypybox2d.body.Body.KINEMATIC,
+    DYNAMIC: pypybox2d.body.Body.DYNAMIC,
+}
+
+
+class World(PhysicsWorld):
+    # pypybox2d bodies already have the interface the simulator expects, so
+    # they are handed out as they are.
+
+    name = 'pypybox2d'
+
+    def __init__(self):
+        super(World, self).__init__()
+        self._world = pypybox2d.world.World(gravity=(0, 0))
+
+    def create_body(self, position=(0, 0), angle=0, type=DYNAMIC,
+                    linear_damping=0.0, angular_damping=0.0):
+        return self._world.create_body(position=position,
+                                       angle=angle,
+                                       linear_damping=linear_damping,
+                                       angular_damping=angular_damping,
+                                       type=BODY_TYPES[type])
+
+    def step(self, time_passed, vel_iters, pos_iters):
+        self._world.step(time_passed,
+                         vel_iters=vel_iters,
+                         pos_iters=pos_iters)
+        return self._take_contact_events()
+
+    def _install_contact_listener(self):
+        # pypybox2d sometimes keeps more than one contact for the same pair of
+        # fixtures, so count them to report each pair only once. Fixtures may
+        # already be touching when watching starts, and will end later.
+        touching = {}
+        contacts = self._world.contact_manager
+        for contact in contacts.contacts:
+            if contact.touching:
+                pair = self._fixture_pair(contact)
+                touching[pair] = touching.get(pair, 0) + 1
+
+        def begin_contact(contact):
+            pair = self._fixture_pair(contact)
+            touching[pair] = touching.get(pair, 0) + 1
+            if touching[pair] == 1:
+                self._report_contact(True, contact)
+
+        def end_contact(contact):
+            pair = self._fixture_pair(contact)
+            touching[pair] -= 1
+            if touching[pair] == 0:
+                del touching[pair]
+                self._report_contact(False, contact)
+
+        contacts.begin_contact = begin_contact
+        contacts.end_contact = end_contact
+
+    @staticmethod
+    def _fixture_pair(contact):
+        return frozenset((contact.fixture_a, contact.fixture_b))
+
+    @staticmethod
+    def _owner(fixture):
+        owner = fixture.user_data
+        if owner is None:
+            owner = fixture.body.user_data
+        return owner
+
+    def _report_contact(self, began, contact):
+        fixture_a = contact.fixture_a
+        fixture_b = contact.fixture_b
+        self._contact(began,
+                      fixture_a.category_bits, self._owner(fixture_a),
+                      fixture_b.category_bits, self._owner(fixture_b))
+
+    def ray_cast(self, start, end):
+        return [RayCastHit(fixture.body, point, fraction)
+                for fixture, point, _, fraction
+                in self._world.ray_cast(start, end)]
+
+    def create_weld_joint(self, body_a, body_b, local_anchor_a,
+                          local_anchor_b):
+        return self._world.create_weld_joint(body_a, body_b,
+                                             local_anchor_a=local_anchor_a,
+                                             local_anchor_b=local_anchor_b)
+
+    def destroy_joint(self, joint):
+        self._world.destroy_joint(joint)
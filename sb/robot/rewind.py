@@ -0,0 +1,165 @@
+"""
+A rolling record of where everything in an arena has been, so that the
+display can pause a live match and scrub back through its last few seconds.
+
+Only arenas shown by a `Simulator` keep a history; headless ones, such as a
+`WorldBatch`'s, don't. Games set how much is kept with the `rewind` option
+of their configuration: either a number of physics steps, or a mapping of
+`PoseHistory`'s arguments, or 0 to keep nothing.
+
+    rewind:
+      steps: 600
+      max_objects: 32
+
+The history takes a fixed amount of memory, allocated up front: a slot for
+the location and heading of each of up to `max_objects` moving objects, for
+each of the last `steps` steps. Robots join the arena after its tokens, so
+`robot_slots` of those slots are kept for them (by default, one for each
+starting zone). Objects which don't fit aren't recorded, with a warning.
+"""
+import warnings
+from array import array
+
+from .game_object import PhysicsObject
+
+# 10 seconds, at the simulator's usual 30 steps per second
+DEFAULT_STEPS = 300
+DEFAULT_MAX_OBJECTS = 64
+
+# Values stored for each object at each step: x, y and heading
+POSE_SIZE = 3
+
+
+class PoseHistory(object):
+    def __init__(self, steps=DEFAULT_STEPS, max_objects=DEFAULT_MAX_OBJECTS,
+                 robot_slots=0):
+        if steps < 1 or max_objects < 1:
+            raise ValueError("Rewind needs room for at least one step and "
+                             "one object")
+        if robot_slots < 0:
+            raise ValueError("Rewind can't keep a negative number of slots "
+                             "for robots")
+        self.steps = steps
+        self.max_objects = max_objects
+        self.robot_slots = robot_slots
+
+        # Objects whose poses are recorded, in the order they're stored.
+        # Arenas only ever gain objects, so each one keeps its slot.
+        self.tracked = []
+        self._robots_tracked = 0
+        self._objects_seen = 0
+
+        self._poses = array('d', [0.0]) * (steps * max_objects * POSE_SIZE)
+        self._times = array('d', [0.0]) * steps
+        # How many of the tracked objects existed at each step
+        self._counts = array('l', [0]) * steps
+        # Whether each tracked object was asleep when last recorded
+        self._asleep = array('b', [0]) * max_objects
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        """The number of steps currently held."""
+        return self._size
+
+    @property
+    def memory(self):
+        """The number of bytes taken by the recorded poses."""
+        return sum(len(values) * values.itemsize
+                   for values in (self._poses, self._times, self._counts))
+
+    def _track_new(self, objects):
+        dropped = 0
+        for obj in objects[self._objects_seen:]:
+            if not isinstance(obj, PhysicsObject):
+                continue
+            room = self.max_objects - len(self.tracked)
+            if not obj.can_see:
+                # Leave the slots kept for robots which haven't arrived yet
+                room -= max(self.robot_slots - self._robots_tracked, 0)
+            if room <= 0:
+                dropped += 1
+                continue
+            self.tracked.append(obj)
+            if obj.can_see:
+                self._robots_tracked += 1
+        self._objects_seen = len(objects)
+        if dropped:
+            warnings.warn("Rewind has no room for {0} more moving objects, so "
+                          "they won't be recorded (max_objects is {1})".format(
+                              dropped, self.max_objects))
+
+    def record(self, time, objects):
+        """Record the poses of the moving objects among `objects`."""
+        if len(objects) != self._objects_seen:
+            self._track_new(objects)
+
+        poses = self._poses
+        stride = self.max_objects * POSE_SIZE
+        index = self._next * stride
+        # Objects which were already asleep in the physics engine last step
+        # haven't moved since, so copying their poses along saves asking
+        # where they are
+        was_asleep = self._asleep
+        if self._size:
+            last = (self._next - 1) % self.steps
+            copyable = self._counts[last]
+            offset = (last - self._next) * stride
+        else:
+            copyable = 0
+        for i, obj in enumerate(self.tracked):
+            asleep = obj.asleep
+            if asleep and was_asleep[i] and i < copyable:
+                poses[index] = poses[index + offset]
+                poses[index + 1] = poses[index + offset + 1]
+                poses[index + 2] = poses[index + offset + 2]
+            else:
+                poses[index], poses[index + 1] = obj.location
+                poses[index + 2] = obj.heading
+                was_asleep[i] = asleep
+            index += POSE_SIZE
+
+        self._times[self._next] = time
+        self._counts[self._next] = len(self.tracked)
+        self._next = (self._next + 1) % self.steps
+        if self._size < self.steps:
+            self._size += 1
+
+    def time_at(self, age):
+        """The arena's time `age` steps before the latest step recorded."""
+        return self._times[self._slot(age)]
+
+    def poses_at(self, age):
+        """
+        Return a dict of the location and heading of each tracked object,
+        `age` steps before the latest step recorded.
+        """
+        slot = self._slot(age)
+        poses = self._poses
+        index = slot * self.max_objects * POSE_SIZE
+        result = {}
+        for obj in self.tracked[:self._counts[slot]]:
+            result[obj] = ((poses[index], poses[index + 1]), poses[index + 2])
+            index += POSE_SIZE
+        return result
+
+    def _slot(self, age):
+        if not 0 <= age < self._size:
+            raise IndexError("Only {0} steps are recorded".format(self._size))
+        return (self._next - 1 - age) % self.steps
+
+
+def make_pose_history(config=None, robot_slots=0):
+    """
+    Create the `PoseHistory` described by a game's `rewind` option, or None
+    if it's turned off. `robot_slots` is used unless the option sets it.
+    """
+    if config is None or config is True:
+        config = {}
+    elif not isinstance(config, dict):
+        if not config:
+            return None
+        config = {'steps': config}
+    config = dict(config)
+    config.setdefault('robot_slots', robot_slots)
+    return PoseHistory(**config)
@@ -1,9 +1,8 @@
 import time
-from math import pi, sin, cos, degrees, hypot, atan2, radians
+from math import pi, sin, cos, degrees, hypot, atan2
 
-from .game_object import GameObject
-
-import pypybox2d
+from .game_object import PhysicsObject
+from .physics import DYNAMIC, CATEGORY_ROBOT
 
 SPEED_SCALE_FACTOR = 0.02
 MAX_MOTOR_SPEED = 100
@@ -14,6 +13,13 @@ HALF_FOV_WIDTH = pi / 6
 
 GRABBER_OFFSET = 0.25
 
+# Ways of holding on to a grabbed token. As a fixture, the token becomes part
+# of the robot's body while held; as a weld, it stays a separate body,
+# connected by a joint the physics engine has to solve every step.
+ATTACH_FIXTURE = 'fixture'
+ATTACH_WELD = 'weld'
+GRAB_ATTACHMENTS = (ATTACH_FIXTURE, ATTACH_WELD)
+
 
 class AlreadyHoldingSomethingException(Exception):
     def __str__(self):
@@ -21,19 +27,57 @@ class AlreadyHoldingSomethingException(Exception):
 
 
 class MotorChannel(object):
+    """
+    One motor output. Powers set by the controller are left in a mailbox,
+    which the robot empties once per physics step, so only the latest power
+    set before each step takes effect.
+
+    The controller's thread is the only one to write the mailbox and the
+    command count, and the physics thread the only one to write the rest,
+    so neither needs to take a lock.
+    """
+
     def __init__(self, robot):
-        self._power = 0
         self._robot = robot
+        self._requested = 0
+        # The power the robot is currently driving with
+        self.applied = 0
+
+        # Number of times the power has been set
+        self.commands = 0
+        # Number of those which were replaced before a step picked them up
+        self.superseded = 0
+        self._collected = 0
 
     @property
     def power(self):
-        return self._power
+        return self._requested
 
     @power.setter
     def power(self, value):
-        value = min(max(value, -MAX_MOTOR_SPEED), MAX_MOTOR_SPEED)
-        with self._robot.lock:
-            self._power = value
+        self._robot._checkpoint()
+        self._requested = min(max(value, -MAX_MOTOR_SPEED), MAX_MOTOR_SPEED)
+        self.commands += 1
+
+    @property
+    def command_rate(self):
+        """Commands per simulated second, so far."""
+        elapsed = self._robot.arena.time
+        return self.commands / elapsed if elapsed > 0 else 0.0
+
+    def collect(self):
+        """Take the latest power out of the mailbox, for the next step."""
+        commands = self.commands
+        pending = commands - self._collected
+        if pending > 1:
+            self.superseded += pending - 1
+        self._collected = commands
+        self.applied = self._requested
+        return self.applied
+
+    def __str__(self):
+        return "{0} commands ({1:.1f} per simulated second), {2} superseded" \
+               .format(self.commands, self.command_rate, self.superseded)
 
 
 class Motor:
@@ -52,129 +96,135 @@ class Motor:
                .format(self.serialnum)
 
 
-class SimRobot(GameObject):
+class SimRobot(PhysicsObject):
+    __slots__ = ('zone', 'motors', 'cpu_account', '_holding', '_attachment')
+
     width = 0.45
 
     surface_name = 'sb/robot.png'
 
-    _holding = None
-
-    ## Constructor ##
-
-    @property
-    def location(self):
-        with self.lock:
-            return self._body.position
-
-    @location.setter
-    def location(self, new_pos):
-        if self._body is None:
-            return  # Slight hack: deal with the initial setting from the constructor
-        with self.lock:
-            self._body.position = new_pos
-
-    @property
-    def heading(self):
-        with self.lock:
-            return self._body.angle
-
-    @heading.setter
-    def heading(self, _new_heading):
-        if self._body is None:
-            return  # Slight hack: deal with the initial setting from the constructor
-        with self.lock:
-            self._body.angle = _new_heading
+    can_see = True
 
     def send_ultrasound_ping(self, angle_offset):
+        self._checkpoint()
         with self.arena.physics_lock:
-            world = self._body.world
-
-            centre_point = self._body.world_center
-
-            spread_casts = 10
-            spread_maximum_angle_radians = radians(10)
-
-            cast = []
-            cast_range = 4.0
-
-            for spread_offset in [
-                spread_maximum_angle_radians * (x / spread_casts)
-                for x in range(-spread_casts, spread_casts + 1)
-            ]:
-                cast_angle = self._body.angle + angle_offset + spread_offset
-
-                target_point = [
-                    centre_point[0] + cast_range * cos(cast_angle),
-                    centre_point[1] + cast_range * sin(cast_angle),
-                ]
-
-                cast.extend(world.ray_cast(centre_point, target_point))
-
-        if not cast:
-            return None
-
-        # Sort by fraction along the ray
-        cast.sort(key=lambda x: x[3])
+            return self.arena.ultrasound.ping(self.arena._physics_world,
+                                              self._body.world_center,
+                                              self._body.angle + angle_offset)
 
-        fixture, intercept_point, _, fraction = cast[0]
-
-        distance_to_intercept = fraction * cast_range
-
-        return distance_to_intercept
+    ## Constructor ##
 
     def __init__(self, simulator):
-        self._body = None
+        arena = simulator.arena
+        half_width = self.width * 0.5
+        with arena.physics_lock:
+            body = arena._physics_world.create_body(position=(0, 0),
+                                                    angle=0,
+                                                    linear_damping=0.0,
+                                                    angular_damping=0.0,
+                                                    type=DYNAMIC)
+            body.create_polygon_fixture([(-half_width, -half_width),
+                                         (half_width, -half_width),
+                                         (half_width,  half_width),
+                                         (-half_width,  half_width)],
+                                        density=500 * 0.12,  # MDF @ 12cm thickness
+                                        category_bits=CATEGORY_ROBOT)
+            super(SimRobot, self).__init__(arena, body)
         self.zone = 0
-        super(SimRobot, self).__init__(simulator.arena)
+        # Set to a `CPUAccount` to hold the robot's controller to a budget
+        self.cpu_account = None
+        self._holding = None
+        self._attachment = None
         self.motors = [Motor(self)]
-        make_body = simulator.arena._physics_world.create_body
-        half_width = self.width * 0.5
-        with self.arena.physics_lock:
-            self._body = make_body(position=(0, 0),
-                                   angle=0,
-                                   linear_damping=0.0,
-                                   angular_damping=0.0,
-                                   type=pypybox2d.body.Body.DYNAMIC)
-            self._body.create_polygon_fixture([(-half_width, -half_width),
-                                               (half_width, -half_width),
-                                               (half_width,  half_width),
-                                               (-half_width,  half_width)],
-                                              density=500 * 0.12)  # MDF @ 12cm thickness
-        simulator.arena.objects.append(self)
+        arena.objects.append(self)
 
     ## Internal methods ##
 
+    def _checkpoint(self):
+        # Called whenever the controller uses the robot API
+        if self.cpu_account is not None:
+            self.cpu_account.checkpoint()
+
     def _apply_wheel_force(self, y_position, power):
         location_world_space = self._body.get_world_point((0, y_position))
-        force_magnitude = power * 0.6
+        drive = self.arena.drive
+        force_magnitude = power * drive.force_scale
         # account for friction
         frict_world = self._body.get_linear_velocity_from_local_point(
             (0, y_position))
         frict_x, frict_y = self._body.get_local_vector(frict_world)
-        force_magnitude -= frict_x * 50.2
+        force_magnitude -= frict_x * drive.friction
         force_world_space = (force_magnitude * cos(self.heading),
                              force_magnitude * sin(self.heading))
         self._body.apply_force(force_world_space, location_world_space)
 
+    def _attach(self, obj):
+        if self.arena.grab_attachment == ATTACH_WELD:
+            world = self.arena._physics_world
+            self._attachment = world.create_weld_joint(self._body,
+                                                       obj._body,
+                                                       local_anchor_a=(
+                                                           GRABBER_OFFSET, 0),
+                                                       local_anchor_b=(0, 0))
+            return
+
+        # Move the object's shape onto the robot, in front of the grabber
+        local_angle = obj.heading - self.heading
+        c, s = cos(local_angle), sin(local_angle)
+        vertices = [(GRABBER_OFFSET + c * x - s * y, s * x + c * y)
+                    for x, y in obj.vertices]
+        self._attachment = self._body.create_polygon_fixture(
+            vertices, user_data=obj, **obj.fixture_settings)
+        obj._body.active = False
+        obj.carry(self, (GRABBER_OFFSET, 0), local_angle)
+
+    def _detach(self, obj):
+        if self.arena.grab_attachment == ATTACH_WELD:
+            self.arena._physics_world.destroy_joint(self._attachment)
+            self._attachment = None
+            return
+
+        # Put the object's body back where it's been carried to, moving
+        # with the grabber
+        location = obj.location
+        heading = obj.heading
+        velocity = self._body.get_linear_velocity_from_local_point(
+            (GRABBER_OFFSET, 0))
+        self._body.destroy_fixture(self._attachment)
+        self._attachment = None
+        obj.drop()
+        obj.location = location
+        obj.heading = heading
+        obj._body.active = True
+        obj._body.linear_velocity = velocity
+        obj._body.angular_velocity = self._body.angular_velocity
+
     ## "Public" methods for simulator code ##
 
     def tick(self, time_passed):
+        # Called by the arena once per step
+        left_power = self.motors[0].m0.collect()
+        right_power = self.motors[0].m1.collect()
         with self.lock, self.arena.physics_lock:
             half_width = self.width * 0.5
             # left wheel
-            self._apply_wheel_force(-half_width, self.motors[0].m0.power)
+            self._apply_wheel_force(-half_width, left_power)
             # right wheel
-            self._apply_wheel_force(half_width, self.motors[0].m1.power*1.05)
+            self._apply_wheel_force(half_width,
+                                    right_power * self.arena.drive.right_bias)
             # kill the lateral velocity
-            right_normal = self._body.get_world_vector((0, 1))
-            lateral_vel = (right_normal.dot(self._body.linear_velocity) *
-                           right_normal)
-            impulse = self._body.mass * -lateral_vel
-            self._body.apply_linear_impulse(impulse, self._body.world_center)
+            normal_x, normal_y = self._body.get_world_vector((0, 1))
+            vel_x, vel_y = self._body.linear_velocity
+            lateral_speed = normal_x * vel_x + normal_y * vel_y
+            impulse_scale = -self._body.mass * lateral_speed
+            self._body.apply_linear_impulse((impulse_scale * normal_x,
+                                             impulse_scale * normal_y),
+                                            self._body.world_center)
 
     ## "Public" methods for user code ##
 
     def grab(self):
+        self._checkpoint()
         if self._holding is not None:
             raise AlreadyHoldingSomethingException()
 
@@ -195,23 +245,23 @@ class SimRobot(GameObject):
             self._holding = objects[0]
             if hasattr(self._holding, '_body'):
                 with self.lock, self.arena.physics_lock:
-                    self._holding_joint = self._body._world.create_weld_joint(self._body,
-                                                                              self._holding._body,
-                                                                              local_anchor_a=(
-                                                                                  GRABBER_OFFSET, 0),
-                                                                              local_anchor_b=(0, 0))
+                    self._attach(self._holding)
             self._holding.grab()
             return True
         else:
             return False
 
+    def see(self, res=(800, 600)):
+        self._checkpoint()
+        return self.arena.vision.see(self, res)
+
     def release(self):
+        self._checkpoint()
         if self._holding is not None:
             self._holding.release()
             if hasattr(self._holding, '_body'):
                 with self.lock, self.arena.physics_lock:
-                    self._body.world.destroy_joint(self._holding_joint)
-                self._holding_joint = None
+                    self._detach(self._holding)
             self._holding = None
             return True
         else:
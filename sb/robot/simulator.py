@@ -2,28 +2,40 @@ import threading
 
 import pygame
 
-from .arenas import TCRArena
+from .arenas import Arena, TCRArena
 from .display import Display
 
 DEFAULT_GAME = 'tin-can-rally'
 
 GAMES = {'tin-can-rally': TCRArena,
+         # Just the arena's outer walls, with nothing inside
+         'empty': Arena,
          }
 
 
+# Options which are about how a match is run, rather than the game itself
+RUN_OPTIONS = ('cpu_budget', 'display', 'rewind')
+
+
+def make_arena(config=None):
+    """Create the arena for the game described by a (parsed YAML) config."""
+    config = dict(config) if config is not None else dict()
+    for option in RUN_OPTIONS:
+        config.pop(option, None)
+    game_name = config.pop('game', DEFAULT_GAME)
+    game = GAMES[game_name]
+    return game(**config)
+
+
 class Simulator(object):
     def __init__(self, config=None, size=(8, 8), frames_per_second=30, background=True):
-        if config is None:
-            config = dict()
-        try:
-            game_name = config['game']
-            del config['game']
-        except KeyError:
-            game_name = DEFAULT_GAME
-        game = GAMES[game_name]
-        self.arena = game(**config)
-
-        self.display = Display(self.arena)
+        config = dict(config) if config is not None else dict()
+        display_config = config.pop('display', None) or dict()
+        self.arena = make_arena(config)
+        # Only worth keeping when there's a display to scrub back through it
+        self.arena.keep_history(config.get('rewind'))
+
+        self.display = Display(self.arena, **display_config)
 
         self.background = background
         self.frames_per_second = frames_per_second
@@ -44,11 +56,15 @@ class Simulator(object):
         clock = pygame.time.Clock()
 
         while True:
+            events = pygame.event.get()
             if any(event.type == pygame.QUIT
                     or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE)
-                    for event in pygame.event.get()):
+                    for event in events):
                 break
 
+            for event in events:
+                self.display.handle_event(event)
+
             self.display.tick(1 / frames_per_second)
             clock.tick(frames_per_second)
 
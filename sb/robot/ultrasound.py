@@ -0,0 +1,129 @@
+"""
+Ultrasound sensor models, trading accuracy for speed.
+
+Games choose one with the `ultrasound` option of their configuration, either
+as a mode name or as a mapping with a `mode` and that model's parameters:
+
+    ultrasound:
+      mode: high
+      noise: 0.02
+"""
+import random
+from math import cos, exp, radians, sin
+
+
+class UltrasoundSensor(object):
+    """
+    Measures the distance to the nearest obstacle by casting rays from the
+    centre of the robot, up to `cast_range` metres.
+    """
+
+    def __init__(self, cast_range=4.0):
+        self.cast_range = cast_range
+
+    def _nearest(self, world, origin, angle):
+        """Return the fraction along the ray to the nearest hit, or None."""
+        x, y = origin
+        target = (x + self.cast_range * cos(angle),
+                  y + self.cast_range * sin(angle))
+        hits = world.ray_cast(origin, target)
+        if not hits:
+            return None
+        return min(hit.fraction for hit in hits)
+
+    def ping(self, world, origin, angle):
+        """
+        Return the distance to whatever the sensor at `origin`, pointing in
+        direction `angle`, detects, or None if it detects nothing.
+        """
+        raise NotImplementedError()
+
+
+class FastUltrasound(UltrasoundSensor):
+    """A single ray straight ahead. Cheap, but misses narrow obstacles."""
+
+    def ping(self, world, origin, angle):
+        fraction = self._nearest(world, origin, angle)
+        if fraction is None:
+            return None
+        return fraction * self.cast_range
+
+
+class SpreadUltrasound(UltrasoundSensor):
+    """
+    A fan of rays, `spread_casts` each side of straight ahead and up to
+    `spread_angle` degrees from it, detecting the nearest hit of any of them.
+    """
+
+    def __init__(self, cast_range=4.0, spread_casts=10, spread_angle=10):
+        super(SpreadUltrasound, self).__init__(cast_range)
+        self.spread_casts = spread_casts
+        half_width = radians(spread_angle)
+        self.offsets = [half_width * (x / spread_casts)
+                        for x in range(-spread_casts, spread_casts + 1)]
+
+    def ping(self, world, origin, angle):
+        fractions = [self._nearest(world, origin, angle + offset)
+                     for offset in self.offsets]
+        fractions = [f for f in fractions if f is not None]
+        if not fractions:
+            return None
+        return min(fractions) * self.cast_range
+
+
+class HighFidelityUltrasound(SpreadUltrasound):
+    """
+    A fan of rays modelling a real sensor's beam. The further a ray is from
+    the beam's axis, the less likely an obstacle it hits is to be detected,
+    falling away as a Gaussian with `beam_width` degrees either side of the
+    axis being about two standard deviations. The measured distance has
+    Gaussian noise with a standard deviation of `noise` metres added.
+    """
+
+    def __init__(self, cast_range=4.0, spread_casts=15, beam_width=15,
+                 noise=0.01, seed=None):
+        super(HighFidelityUltrasound, self).__init__(cast_range,
+                                                     spread_casts,
+                                                     beam_width)
+        self.noise = noise
+        half_width = radians(beam_width)
+        self.detection_chances = [exp(-2 * (offset / half_width) ** 2)
+                                  for offset in self.offsets]
+        self._random = random.Random(seed)
+
+    def ping(self, world, origin, angle):
+        detected = []
+        for offset, chance in zip(self.offsets, self.detection_chances):
+            fraction = self._nearest(world, origin, angle + offset)
+            if fraction is not None and self._random.random() < chance:
+                detected.append(fraction)
+        if not detected:
+            return None
+        distance = min(detected) * self.cast_range
+        distance += self._random.gauss(0, self.noise)
+        return min(max(distance, 0.0), self.cast_range)
+
+
+ULTRASOUND_MODES = {
+    'fast': FastUltrasound,
+    'normal': SpreadUltrasound,
+    'high': HighFidelityUltrasound,
+}
+
+DEFAULT_ULTRASOUND_MODE = 'normal'
+
+
+def make_ultrasound(config=None):
+    """Create the ultrasound model described by a game's configuration."""
+    if config is None:
+        config = DEFAULT_ULTRASOUND_MODE
+    if isinstance(config, str):
+        config = {'mode': config}
+    config = dict(config)
+    mode = config.pop('mode', DEFAULT_ULTRASOUND_MODE)
+    try:
+        model = ULTRASOUND_MODES[mode]
+    except KeyError:
+        raise ValueError("Unknown ultrasound mode {0!r} (expected one of "
+                         "{1})".format(mode, ', '.join(sorted(ULTRASOUND_MODES))))
+    return model(**config)
@@ -0,0 +1,188 @@
+"""
+Simulated camera: which markers each robot can see.
+
+Visibility is worked out for every robot in an arena at once, the first time
+any of them looks after a physics step, and then reused until the next step.
+Markers are found with a field of view query over a grid of cells, and only
+the walls in cells a line of sight passes near are checked for occlusion.
+"""
+import time
+from collections import namedtuple
+from math import atan2, cos, degrees, floor, hypot, sin
+
+from .sim_robot import HALF_FOV_WIDTH
+
+MARKER_ARENA, MARKER_TOKEN = 'arena', 'token'
+
+# Codes of the first marker of each type
+MARKER_CODE_BASES = {
+    MARKER_ARENA: 0,
+    MARKER_TOKEN: 40,
+}
+
+# The size of each type of marker on the real kit, in metres
+MARKER_SIZES = {
+    MARKER_ARENA: 0.25,
+    MARKER_TOKEN: 0.1,
+}
+
+MAX_VISION_RANGE = 8.0
+
+# The side of a cell of the spatial index, in metres
+CELL_SIZE = 1.0
+
+MarkerInfo = namedtuple('MarkerInfo', ('code', 'marker_type', 'offset', 'size'))
+PolarCoord = namedtuple('PolarCoord', ('length', 'rot_y'))
+
+
+class Marker(namedtuple('Marker', ('info', 'centre', 'res', 'timestamp'))):
+    __slots__ = ()
+
+    @property
+    def dist(self):
+        return self.centre.length
+
+    @property
+    def rot_y(self):
+        return self.centre.rot_y
+
+
+def create_marker_info_by_type(marker_type, offset):
+    return MarkerInfo(code=MARKER_CODE_BASES[marker_type] + offset,
+                      marker_type=marker_type,
+                      offset=offset,
+                      size=MARKER_SIZES[marker_type])
+
+
+def _cell(x, y):
+    return (int(floor(x / CELL_SIZE)), int(floor(y / CELL_SIZE)))
+
+
+def _cells_in(min_x, min_y, max_x, max_y):
+    min_cx, min_cy = _cell(min_x, min_y)
+    max_cx, max_cy = _cell(max_x, max_y)
+    for cx in range(min_cx, max_cx + 1):
+        for cy in range(min_cy, max_cy + 1):
+            yield (cx, cy)
+
+
+def _segment_hits_box(x0, y0, x1, y1, box):
+    """Whether the segment from (x0, y0) to (x1, y1) passes through `box`."""
+    min_x, min_y, max_x, max_y = box
+    t_enter, t_exit = 0.0, 1.0
+    for start, delta, low, high in ((x0, x1 - x0, min_x, max_x),
+                                    (y0, y1 - y0, min_y, max_y)):
+        if delta == 0:
+            if not low <= start <= high:
+                return False
+            continue
+        t_low = (low - start) / delta
+        t_high = (high - start) / delta
+        if t_low > t_high:
+            t_low, t_high = t_high, t_low
+        t_enter = max(t_enter, t_low)
+        t_exit = min(t_exit, t_high)
+        if t_enter > t_exit:
+            return False
+    return True
+
+
+class Vision(object):
+    def __init__(self, arena):
+        self.arena = arena
+        self._seen_at = None
+        self._visible = {}
+        self._occluders = None
+        self._occluder_grid = {}
+
+    def _index_occluders(self, opaque):
+        # Walls don't move, so this is only redone if walls are added
+        grid = {}
+        for obj in opaque:
+            for cell in _cells_in(*obj.bounds):
+                grid.setdefault(cell, []).append(obj.bounds)
+        self._occluders = opaque
+        self._occluder_grid = grid
+
+    def _index_markers(self, markers):
+        grid = {}
+        for obj in markers:
+            x, y = obj.location
+            grid.setdefault(_cell(x, y), []).append((obj, x, y))
+        return grid
+
+    def _occluded(self, x0, y0, x1, y1):
+        grid = self._occluder_grid
+        checked = set()
+        for cell in _cells_in(min(x0, x1), min(y0, y1),
+                              max(x0, x1), max(y0, y1)):
+            for box in grid.get(cell, ()):
+                if box in checked:
+                    continue
+                checked.add(box)
+                if _segment_hits_box(x0, y0, x1, y1, box):
+                    return True
+        return False
+
+    def _visible_from(self, robot, marker_grid, res, timestamp):
+        x, y = robot.location
+        heading = robot.heading
+
+        # Bounding box of the field of view
+        xs = [x]
+        ys = [y]
+        for edge in (-HALF_FOV_WIDTH, 0, HALF_FOV_WIDTH):
+            xs.append(x + MAX_VISION_RANGE * cos(heading + edge))
+            ys.append(y + MAX_VISION_RANGE * sin(heading + edge))
+
+        markers = []
+        for cell in _cells_in(min(xs), min(ys), max(xs), max(ys)):
+            for obj, marker_x, marker_y in marker_grid.get(cell, ()):
+                dx = marker_x - x
+                dy = marker_y - y
+                dist = hypot(dx, dy)
+                if dist > MAX_VISION_RANGE:
+                    continue
+                bearing = atan2(dy, dx) - heading
+                bearing = atan2(sin(bearing), cos(bearing))
+                if abs(bearing) > HALF_FOV_WIDTH:
+                    continue
+                if not obj.faces(x, y):
+                    continue
+                if self._occluded(x, y, marker_x, marker_y):
+                    continue
+                markers.append(Marker(info=obj.marker_info,
+                                      centre=PolarCoord(length=dist,
+                                                        rot_y=degrees(bearing)),
+                                      res=res,
+                                      timestamp=timestamp))
+
+        markers.sort(key=lambda marker: marker.dist)
+        return markers
+
+    def see(self, robot, res):
+        """Return the markers `robot` can see, nearest first."""
+        timestamp = time.time()
+        arena = self.arena
+        with arena.physics_lock:
+            if self._seen_at != arena.time:
+                self._seen_at = arena.time
+                self._visible = {}
+
+            if robot not in self._visible:
+                opaque = [o for o in arena.objects if o.opaque]
+                if opaque != self._occluders:
+                    self._index_occluders(opaque)
+                marker_grid = self._index_markers(
+                    [o for o in arena.objects if o.marker_info is not None])
+
+                # Work out what every robot can see while the index is built
+                for obj in arena.objects:
+                    if obj.can_see and obj not in self._visible:
+                        self._visible[obj] = self._visible_from(
+                            obj, marker_grid, res, timestamp)
+
+            markers = self._visible[robot]
+
+        return [marker._replace(res=res, timestamp=timestamp)
+                for marker in markers]
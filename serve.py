@@ -0,0 +1,196 @@
+"""
+Run matches from a long-lived server, so that each one starts in
+milliseconds rather than paying for interpreter start-up and imports.
+
+The server imports the simulator once, then forks a fresh worker for each
+match, which shares the server's memory until it writes to it. Game configs
+and compiled robot scripts are cached in the server, so workers inherit
+them ready to use.
+
+Start the server from the root of the repository:
+
+    $ python serve.py
+
+then run matches through it, with the same arguments as run.py:
+
+    $ python serve.py --submit -c games/tcr.yaml test.py test.py
+
+Only works on platforms with `os.fork`.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+
+import yaml
+
+DEFAULT_SOCKET = 'sb-robot.sock'
+DEFAULT_CONFIG = 'games/tcr.yaml'
+
+# How long a client has to send its request, in seconds, before the server
+# gives up on it and moves on to the next
+REQUEST_TIMEOUT = 5
+
+_configs = {}
+
+
+def load_config(path):
+    """Parse a game config, reusing the last parse if the file's unchanged."""
+    mtime = os.path.getmtime(path)
+    cached = _configs.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path) as f:
+            cached = (mtime, yaml.safe_load(f))
+        _configs[path] = cached
+    return cached[1]
+
+
+def check_request(request):
+    """Raise ValueError unless `request` is a well formed match request."""
+    if not isinstance(request, dict):
+        raise ValueError("expected a JSON object")
+    scripts = request.get('scripts')
+    if (not isinstance(scripts, list) or not scripts or
+            not all(isinstance(script, str) for script in scripts)):
+        raise ValueError("'scripts' should be a list of file names")
+    if not isinstance(request.get('config', DEFAULT_CONFIG), str):
+        raise ValueError("'config' should be a file name")
+
+
+def start_match(server, conn, request):
+    """Fork a worker to run the requested match, writing its output to `conn`."""
+    from sb.robot.match import compile_script, run_match
+
+    config_path = request.get('config', DEFAULT_CONFIG)
+    scripts = request['scripts']
+    # Do the parsing and compiling here, so the next match starts warm
+    config = load_config(config_path)
+    for script in scripts:
+        try:
+            compile_script(script)
+        except (OSError, SyntaxError, ValueError):
+            # The match still runs, and the script's robot reports the error
+            pass
+
+    pid = os.fork()
+    if pid != 0:
+        return pid
+
+    # In the worker
+    status = 1
+    try:
+        server.close()
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(conn.fileno(), 1)
+        os.dup2(conn.fileno(), 2)
+        run_match(config, scripts)
+        status = 0
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Skip the server's clean-up, and robot threads still running
+        os._exit(status)
+
+
+def _stop(signum, frame):
+    sys.exit(0)
+
+
+def serve(path):
+    # Load the simulator now, so that every worker inherits it (the client
+    # doesn't need it, so it isn't imported at the top)
+    import sb.robot.match  # noqa
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(5)
+    # Let finished workers be reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, _stop)
+    print("Waiting for matches on {0}".format(path))
+    sys.stdout.flush()
+
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    conn.settimeout(REQUEST_TIMEOUT)
+                    with conn.makefile('r') as f:
+                        request = json.loads(f.readline())
+                    # The worker writes its output to the connection, and
+                    # should wait for slow clients rather than fail
+                    conn.settimeout(None)
+                    check_request(request)
+                    pid = start_match(server, conn, request)
+                except (ValueError, KeyError, OSError,
+                        yaml.YAMLError) as e:
+                    try:
+                        conn.sendall("Couldn't start the match: {0}\n"
+                                     .format(e).encode())
+                    except OSError:
+                        # The client has gone away
+                        pass
+                    continue
+                print("Match {0}: {1}".format(pid, ', '.join(request['scripts'])))
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        os.unlink(path)
+
+
+def submit(path, config, scripts):
+    """Ask the server to run a match, and copy its output to ours."""
+    request = {'config': os.path.abspath(config),
+               'scripts': [os.path.abspath(script) for script in scripts]}
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    with client:
+        client.sendall((json.dumps(request) + '\n').encode())
+        while True:
+            data = client.recv(4096)
+            if not data:
+                break
+            sys.stdout.write(data.decode(errors='replace'))
+            sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--socket',
+                        default=DEFAULT_SOCKET,
+                        help="the server's socket (default: %(default)s)")
+    parser.add_argument('--submit',
+                        action='store_true',
+                        help="run a match on a running server")
+    parser.add_argument('-c', '--config',
+                        default=DEFAULT_CONFIG)
+    parser.add_argument('robot_scripts',
+                        nargs='*')
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        parser.error("the server needs os.fork, which this platform lacks")
+
+    if args.submit:
+        if not args.robot_scripts:
+            parser.error("give the robot scripts to run")
+        submit(args.socket, args.config, args.robot_scripts)
+    else:
+        serve(args.socket)
+
+
+if __name__ == '__main__':
+    main()
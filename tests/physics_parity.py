@@ -0,0 +1,201 @@
+"""
+Checks that every available physics backend produces the same trajectories.
+
+Run with `python -m tests.physics_parity`.
+"""
+from math import atan2, cos, pi, sin
+
+from sb.robot import WorldBatch
+from sb.robot.physics import (BACKENDS, CATEGORY_ROBOT, CATEGORY_TOKEN,
+                              CATEGORY_WALL, get_backend)
+
+TIME_STEP = 1 / 30
+SAMPLE_EVERY = 15  # steps
+
+# Largest acceptable disagreement between backends
+POSITION_TOLERANCE = 0.005  # metres
+HEADING_TOLERANCE = 0.001  # radians
+RANGE_TOLERANCE = 0.01  # metres
+
+
+def scripted(*phases):
+    """A controller which sets motor powers (m0, m1) for a number of steps."""
+    schedule = []
+    for steps, powers in phases:
+        schedule.extend([powers] * steps)
+
+    def controller(robot, world):
+        step = min(int(round(world.time / TIME_STEP)), len(schedule) - 1)
+        robot.motors[0].m0.power, robot.motors[0].m1.power = schedule[step]
+    return controller
+
+
+def grab_and_carry(robot, world):
+    # Drive up to the token at (-0.5, -3), pick it up, carry it off and
+    # put it down again
+    step = int(round(world.time / TIME_STEP))
+    motors = robot.motors[0]
+    if step == 40:
+        robot.grab()
+    if step == 100:
+        robot.release()
+    if step < 30:
+        motors.m0.power, motors.m1.power = 40, 40
+    elif step < 45:
+        motors.m0.power, motors.m1.power = 0, 0
+    elif step < 90:
+        motors.m0.power, motors.m1.power = -40, 40
+    else:
+        motors.m0.power, motors.m1.power = -40, -40
+
+
+SCENARIOS = {
+    'straight': (scripted((90, (50, 50))), (-3, -3), 0, {}),
+    'spin': (scripted((60, (50, -50)), (30, (0, 0))), (-3, -3), 0, {}),
+    'into the wall': (scripted((120, (80, 80))), (-3, 0.2), 0, {}),
+    'push a token': (scripted((120, (60, 60))), (-3, -3.2), 0, {}),
+    'grab and carry': (grab_and_carry, (-1.1, -3), 0, {}),
+    'grab and carry (weld)': (grab_and_carry, (-1.1, -3), 0,
+                              {'grab_attachment': 'weld'}),
+}
+
+
+def trajectory(backend, controller, location, heading, config, steps=120):
+    batch = WorldBatch(dict(config, physics=backend))
+    world = batch[0]
+    robot = world.add_robot(controller)
+    robot.location = location
+    robot.heading = heading
+
+    samples = []
+    for step in range(steps):
+        batch.step(TIME_STEP)
+        if step % SAMPLE_EVERY == 0:
+            x, y = robot.location
+            samples.append((x, y, robot.heading))
+    assert world.error is None, world.error
+    return samples
+
+
+def ultrasound_ranges(backend):
+    world = WorldBatch({'physics': backend})[0]
+    robot = world.add_robot(lambda robot, world: None)
+    return [robot.send_ultrasound_ping(angle)
+            for angle in (0, pi / 2, pi, -pi / 2)]
+
+
+def angle_between(a, b):
+    return abs(atan2(sin(a - b), cos(a - b)))
+
+
+def contact_begins(backend):
+    # Push a token into the central wall, then back off. Whether a token
+    # left resting against a wall still counts as touching is down to
+    # rounding, so only the starts of contacts are compared.
+    world = WorldBatch({'physics': backend})[0]
+    events = []
+    world.arena.add_contact_listener(events.extend,
+                                     CATEGORY_ROBOT, CATEGORY_TOKEN)
+    world.arena.watch_contacts(CATEGORY_TOKEN, CATEGORY_WALL)
+    robot = world.add_robot(scripted((60, (60, 60)), (60, (-60, -60))))
+    robot.location = (-3.6, 0.5)
+    robot.heading = 0
+    for _ in range(120):
+        world.step(TIME_STEP)
+    return [sorted((type(event.a).__name__, type(event.b).__name__))
+            for event in events if event.began]
+
+
+def late_watch_contacts(backend):
+    # Start watching while the robot is already pressed against the central
+    # wall, then back off: the end of that contact is still reported
+    world = WorldBatch({'physics': backend})[0]
+    robot = world.add_robot(scripted((60, (80, 80)), (60, (-80, -80))))
+    robot.location = (-3, 0.2)
+    robot.heading = 0
+    events = []
+    for step in range(120):
+        if step == 50:
+            world.arena.add_contact_listener(events.extend,
+                                             CATEGORY_ROBOT, CATEGORY_WALL)
+        world.step(TIME_STEP)
+    assert world.error is None, world.error
+    return [(event.began, sorted((type(event.a).__name__,
+                                  type(event.b).__name__)))
+            for event in events]
+
+
+def carried_token_contacts(backend):
+    # A carried token is part of its robot's body, but should still be the
+    # one reported as touching the wall it's carried into
+    world = WorldBatch({'physics': backend})[0]
+    events = []
+    world.arena.add_contact_listener(events.extend,
+                                     CATEGORY_TOKEN, CATEGORY_WALL)
+    robot = world.add_robot(scripted((120, (60, 60))))
+    robot.location = (2.5, -2)
+    robot.heading = 0
+    token = [obj for obj in world.arena.objects if obj.grabbable][0]
+    token.location = (2.82, -2)
+    token.heading = 0
+    assert robot.grab()
+    for _ in range(120):
+        world.step(TIME_STEP)
+    return [event.a if event.b is world.arena else event.b
+            for event in events if event.began]
+
+
+def available_backends():
+    names = []
+    for name, _ in BACKENDS:
+        try:
+            get_backend(name)
+        except ImportError:
+            print("Skipping {0}: not installed".format(name))
+        else:
+            names.append(name)
+    return names
+
+
+def compare(reference, backend):
+    for name, (controller, location, heading, config) in \
+            sorted(SCENARIOS.items()):
+        expected = trajectory(reference, controller, location, heading, config)
+        actual = trajectory(backend, controller, location, heading, config)
+        for (ex, ey, eh), (ax, ay, ah) in zip(expected, actual):
+            assert abs(ex - ax) <= POSITION_TOLERANCE and \
+                abs(ey - ay) <= POSITION_TOLERANCE, \
+                "{0}: {1} went to ({2:.3f}, {3:.3f}), {4} to ({5:.3f}, {6:.3f})".format(
+                    name, reference, ex, ey, backend, ax, ay)
+            assert angle_between(eh, ah) <= HEADING_TOLERANCE, \
+                "{0}: {1} faced {2:.3f}, {3} faced {4:.3f}".format(
+                    name, reference, eh, backend, ah)
+
+    expected, actual = contact_begins(reference), contact_begins(backend)
+    assert expected, "contacts: none reported"
+    assert expected == actual, "contacts: {0} != {1}".format(expected, actual)
+
+    expected = late_watch_contacts(reference)
+    actual = late_watch_contacts(backend)
+    assert expected, "late contacts: none reported"
+    assert expected == actual, "late contacts: {0} != {1}".format(expected,
+                                                                  actual)
+
+    for expected, actual in zip(ultrasound_ranges(reference),
+                                ultrasound_ranges(backend)):
+        if expected is None or actual is None:
+            assert expected is actual, "ultrasound: {0} != {1}".format(
+                expected, actual)
+        else:
+            assert abs(expected - actual) <= RANGE_TOLERANCE, \
+                "ultrasound: {0:.3f} != {1:.3f}".format(expected, actual)
+
+
+backends = available_backends()
+for backend in backends:
+    touched = carried_token_contacts(backend)
+    assert touched and all(type(obj).__name__ == 'Token' for obj in touched), \
+        "{0}: carried token reported as {1}".format(backend, touched)
+for backend in backends[1:]:
+    compare(backends[0], backend)
+    print("{0} matches {1}".format(backend, backends[0]))
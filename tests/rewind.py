@@ -0,0 +1,67 @@
+"""
+Checks that the rewind history gives back the poses objects really had,
+after its buffer has wrapped around, for objects which fell asleep, and
+for robots which arrived after recording started.
+
+Run with `python -m tests.rewind`.
+"""
+from sb.robot import WorldBatch
+
+TIME_STEP = 1 / 30
+STEPS_KEPT = 8
+
+
+def drive(robot, world):
+    robot.motors[0].m0.power, robot.motors[0].m1.power = 50, 30
+
+
+def pose(obj):
+    x, y = obj.location
+    return ((x, y), obj.heading)
+
+
+world = WorldBatch()[0]
+arena = world.arena
+arena.keep_history({'steps': STEPS_KEPT})
+history = arena.history
+token = [obj for obj in arena.objects if obj.grabbable][0]
+
+# What every tracked object's pose really was, after each step
+recorded = []
+robot = None
+slept = False
+for step in range(80):
+    if step == 5:
+        # The robot turns up once recording has started
+        robot = world.add_robot(drive)
+    if step == 50:
+        # By now the token's been asleep for a while, and its pose copied
+        # along from step to step. Moving it wakes it.
+        assert slept, "the token never fell asleep, so copying wasn't checked"
+        token.location = (1, 1)
+    world.step(TIME_STEP)
+    assert world.error is None, world.error
+    recorded.append((arena.time, {obj: pose(obj) for obj in history.tracked}))
+    slept = slept or token.asleep
+
+    assert len(history) == min(step + 1, STEPS_KEPT)
+    for age in range(len(history)):
+        time, poses = recorded[-1 - age]
+        assert history.time_at(age) == time, \
+            "step {0}, age {1}: time {2} != {3}".format(
+                step, age, history.time_at(age), time)
+        assert history.poses_at(age) == poses, \
+            "step {0}, age {1}: poses differ".format(step, age)
+
+    for age in (len(history), STEPS_KEPT, -1):
+        for lookup in (history.time_at, history.poses_at):
+            try:
+                lookup(age)
+            except IndexError:
+                pass
+            else:
+                raise AssertionError("age {0} was looked up after step "
+                                     "{1}".format(age, step))
+
+assert robot in history.tracked, "the late robot wasn't tracked"
+print("Rewind history matches the recorded poses")
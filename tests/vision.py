@@ -0,0 +1,72 @@
+"""
+Checks which markers a robot's camera sees: how far away and at what
+bearing, and that markers behind the central wall or outside the field of
+view are left out.
+
+Run with `python -m tests.vision`.
+"""
+from math import atan2, cos, degrees, hypot, sin
+
+from sb.robot import WorldBatch
+from sb.robot.vision import MARKER_TOKEN, create_marker_info_by_type
+
+TOLERANCE = 1e-9
+
+
+def sees_token_at(robot_pose, token_location):
+    """
+    Put a robot and a token in a fresh arena, and return what the robot's
+    camera makes of the token, or None if it can't see it.
+    """
+    world = WorldBatch()[0]
+    robot = world.add_robot(lambda robot, world: None)
+    robot.location, robot.heading = robot_pose
+    token = [obj for obj in world.arena.objects if obj.grabbable][0]
+    token.location = token_location
+    code = create_marker_info_by_type(MARKER_TOKEN, 0).code
+    for marker in robot.see():
+        if marker.info.code == code:
+            return marker
+    return None
+
+
+def check_visible(robot_pose, token_location):
+    (x, y), heading = robot_pose
+    token_x, token_y = token_location
+    marker = sees_token_at(robot_pose, token_location)
+    assert marker is not None, \
+        "token at {0} not seen from {1}".format(token_location, robot_pose)
+    dist = hypot(token_x - x, token_y - y)
+    bearing = atan2(token_y - y, token_x - x) - heading
+    bearing = degrees(atan2(sin(bearing), cos(bearing)))
+    assert abs(marker.dist - dist) <= TOLERANCE, \
+        "token at {0}: dist {1} != {2}".format(token_location,
+                                               marker.dist, dist)
+    assert abs(marker.rot_y - bearing) <= TOLERANCE, \
+        "token at {0}: rot_y {1} != {2}".format(token_location,
+                                                marker.rot_y, bearing)
+
+
+def check_hidden(robot_pose, token_location, why):
+    marker = sees_token_at(robot_pose, token_location)
+    assert marker is None, "token at {0} seen from {1}, though {2}".format(
+        token_location, robot_pose, why)
+
+
+# Ahead and off to one side, in a neighbouring cell of the index
+check_visible(((-3.5, -3), 0), (-2.5, -2.5))
+# Straight ahead, several cells away, passing below the central wall
+check_visible(((-3.5, -3.5), 0), (2.5, -3.5))
+# Facing the other way, across the line where bearings wrap around
+check_visible(((3.5, 3.5), 3.0), (1.5, 3.0))
+
+# In range and straight ahead, but on the far side of the central wall
+check_hidden(((-3.5, 0), 0), (3, 0), "the central wall is in the way")
+check_hidden(((-3.5, 1), 0), (3, -1), "the central wall is in the way")
+
+# Beside and behind the robot, and just outside the 30 degree half-angle
+check_hidden(((-3.5, -3), 0), (-3.5, -2), "it's beside the robot")
+check_hidden(((-3, -3), 0), (-3.8, -3), "it's behind the robot")
+check_hidden(((-3.5, -3.5), 0), (-2.5, -2.9), "it's outside the view")
+
+print("Vision sees what it should")